@@ -15,12 +15,17 @@ from .paper_texture_basic import add_paper_texture_basic
 from .paper_texture_xuan import add_xuan_paper_texture, add_xuan_paper_texture_enhanced
 from .paper_texture_rice import add_rice_paper_texture_enhanced
 from .paper_texture_parchment import add_parchment_texture_enhanced
-from .ink_bleed_effect_xuan import add_ink_bleed_effect, add_ink_bleed_effect_optimized, add_ink_bleed_effect_enhanced
+from .paper_texture_tiles import configure_paper_tile_cache, clear_paper_tile_cache
+from .paper_texture_engine import PAPER_SPECS, get_paper_spec, merge_paper_spec, render_paper_texture
+from .render_quality import RENDER_QUALITY_TIERS, configure_render_quality, render_quality
+from .ink_bleed_effect_xuan import add_ink_bleed_effect, add_ink_bleed_effect_optimized, add_ink_bleed_effect_enhanced, ink_bleed_sweep
 from .ink_bleed_effect_rice import add_subtle_ink_effect
 from .ink_bleed_effect_parchment import add_ink_bleed_effect_parchment
-from .paper_texture_type import create_authentic_torn_paper, create_realistic_paper_texture, apply_paper_texture, create_authentic_paper_texture, add_realistic_aging
+from .ink_diffusion_solver import add_ink_diffusion_effect
+from .ink_bleed_sprite_cache import draw_text_with_bleed, configure_bleed_sprite_cache, clear_bleed_sprite_cache
+from .paper_texture_type import create_authentic_torn_paper, create_realistic_paper_texture, apply_paper_texture, create_authentic_paper_texture, add_realistic_aging, resolve_paper_size
 from .poem_to_char_conversion import poem_to_flat_char_list, convert_poem_to_char_matrix, poem_to_char_matrix
-from .paper_edge_natural_torn import add_organic_torn_mask, safe_apply_mask
+from .paper_edge_natural_torn import add_organic_torn_mask, safe_apply_mask, clear_torn_outline_cache, configure_torn_outline_cache, generate_fractal_torn_edge
 from .seal_texture_type import add_texture_and_aging
 from .text_inscription_type import add_upper_inscription, add_vertical_upper_inscription, add_vertical_lower_inscription, add_special_lower_inscription
 from .char_type_lishu import get_lishu_spacing
@@ -1,39 +1,77 @@
 from PIL import Image, ImageDraw, ImageFilter, ImageOps, ImageFont
-import random
-import math
 import numpy as np
 
-def add_ink_bleed_effect_parchment(image):
-    """羊皮纸特有的纹理墨迹效果"""
-    width, height = image.size
-    result = image.copy()
+from .ink_bleed_engine import get_ink_mask
+from .ink_bleed_regions import apply_ink_effect_in_regions
+
+# 羊皮纸墨迹参数
+PARCHMENT_INK_RADIUS = 3        # 邻域半径（7×7）
+PARCHMENT_INK_PROBABILITY = 0.4 # 每个文字像素影响邻域像素的概率（不均匀分布）
+PARCHMENT_INK_DARKEN = 25       # 距离为0处的变暗量
+PARCHMENT_BACKGROUND_LEVEL = 180  # 亮度高于此值才视为背景
+
+
+def _shifted_sum_1d(array, weights, axis):
+    """沿一个轴做一维卷积（越界视为0），weights 的中心为偏移0"""
+    radius = len(weights) // 2
+    pad = [(0, 0), (0, 0)]
+    pad[axis] = (radius, radius)
+    padded = np.pad(array, pad)
+    length = array.shape[axis]
+    result = np.zeros_like(array)
+    for i, weight in enumerate(weights):
+        if weight:
+            result += weight * (padded[i:i + length] if axis == 0 else padded[:, i:i + length])
+    return result
+
+
+def get_parchment_ink_darkening(text_mask):
+    """
+    文字掩码与归一化曼哈顿距离核的卷积：每个背景像素的期望变暗量
+
+    核 K(dx, dy) = p × 25 × (1 - (|dx| + |dy|) / 6) 可拆成 u(dx) + u(dy)，
+    其中 u(t) = p × 25 × (1/2 - |t| / 6)，因此只需四次一维卷积
+    """
+    offsets = np.arange(-PARCHMENT_INK_RADIUS, PARCHMENT_INK_RADIUS + 1)
+    falloff = PARCHMENT_INK_PROBABILITY * PARCHMENT_INK_DARKEN * (0.5 - np.abs(offsets) / (2 * PARCHMENT_INK_RADIUS))
+    box = np.ones(len(offsets))
+
+    mask = text_mask.astype(np.float32)
+    return (_shifted_sum_1d(_shifted_sum_1d(mask, box, 0), falloff, 1)
+            + _shifted_sum_1d(_shifted_sum_1d(mask, falloff, 0), box, 1))
+
+
+def add_ink_bleed_effect_parchment(image, regions=None, seed=None):
+    """
+    羊皮纸特有的纹理墨迹效果
+
+    墨迹在羊皮纸上吸收不均匀：文字附近的背景按曼哈顿距离衰减变暗，
+    变暗量再乘以羊皮纸噪声场（0.5~1.5），亮度降到背景阈值附近为止
+
+    Args:
+        image: 输入图像
+        regions: 墨迹区域 - None 处理整幅画布，"auto" 自动检测，或包围盒列表
+        seed: 随机种子（可选）
+    """
+    if regions is not None:
+        # 只处理墨迹区域：扩展 = 7×7 邻域半径 + 1
+        return apply_ink_effect_in_regions(image, add_ink_bleed_effect_parchment, regions, 4, seed=seed)
     
-    # 找到文字区域
-    gray = image.convert('L')
+    rng = np.random.default_rng(seed)
+    pixels = np.array(image)
+    rgb = pixels[..., :3].astype(np.int16)
     
-    for x in range(width):
-        for y in range(height):
-            if gray.getpixel((x, y)) < 100:  # 文字区域
-                # 在羊皮纸上墨迹会不均匀
-                for dx in range(-3, 4):
-                    for dy in range(-3, 4):
-                        nx, ny = x + dx, y + dy
-                        if 0 <= nx < width and 0 <= ny < height:
-                            # 羊皮纸上的墨迹会有纹理感
-                            if random.random() < 0.4:  # 不均匀分布
-                                r, g, b = result.getpixel((nx, ny))
-                                brightness = (r + g + b) // 3
-                                
-                                if brightness > 180:  # 背景区域
-                                    # 根据距离和随机因素变暗
-                                    distance = abs(dx) + abs(dy)
-                                    random_factor = random.uniform(0.5, 1.5)
-                                    darken = int(25 * (1 - distance/6) * random_factor)
-                                    
-                                    result.putpixel((nx, ny), (
-                                        max(0, r - darken),
-                                        max(0, g - darken),
-                                        max(0, b - darken)
-                                    ))
+    # 文字附近的期望变暗量 × 羊皮纸噪声场
+    darkening = get_parchment_ink_darkening(get_ink_mask(image))
+    noise = rng.uniform(0.5, 1.5, darkening.shape).astype(np.float32)
+    darkening *= noise
     
-    return result
+    # 只变暗背景区域；亮度降到阈值以下后不再继续变暗（允许最后一次略微越过）
+    brightness = rgb.sum(axis=2) // 3
+    headroom = brightness - PARCHMENT_BACKGROUND_LEVEL
+    darkening = np.minimum(darkening, headroom + PARCHMENT_INK_DARKEN * noise / 4)
+    darkening = np.where(headroom > 0, darkening, 0).astype(np.int16)
+    
+    pixels[..., :3] = np.clip(rgb - darkening[..., None], 0, 255).astype(np.uint8)
+    
+    return Image.fromarray(pixels, image.mode)
@@ -1,37 +1,35 @@
-import random
+from PIL import Image
+import numpy as np
 
-def add_subtle_ink_effect(image, strength=0.1):
+from .ink_bleed_engine import get_ink_mask, dilate_mask
+from .ink_bleed_regions import apply_ink_effect_in_regions
+
+def add_subtle_ink_effect(image, strength=0.1, regions=None, seed=None):
     """
      subtle墨迹效果（最保守的版本）
+    
+    Args:
+        image: 输入图像
+        strength: 变暗概率
+        regions: 墨迹区域 - None 处理整幅画布，"auto" 自动检测，或包围盒列表
+        seed: 随机种子（可选）
     """
-    width, height = image.size
-    result = image.copy()
-    gray = image.convert('L')
+    if regions is not None:
+        # 只处理墨迹区域：扩展 = 5×5 邻域半径 + 1
+        return apply_ink_effect_in_regions(image, add_subtle_ink_effect, regions, 3,
+                                           strength=strength, seed=seed)
+    
+    rng = np.random.default_rng(seed)
+    gray = np.array(image.convert('L'))
+    
+    # 文字掩码膨胀（5×5 最大值滤波）得到文字附近的区域
+    near_text = dilate_mask(get_ink_mask(image), 2)
+    
+    # 只处理文字边缘的背景像素，按概率轻微变暗
+    darken = near_text & (gray > 180) & (rng.random(gray.shape) < strength)
     
-    # 只处理文字边缘
-    for x in range(width):
-        for y in range(height):
-            # 如果是背景区域
-            if gray.getpixel((x, y)) > 180:
-                # 检查周围是否有文字
-                has_nearby_text = False
-                for dx in range(-2, 3):
-                    for dy in range(-2, 3):
-                        nx, ny = x + dx, y + dy
-                        if 0 <= nx < width and 0 <= ny < height:
-                            if gray.getpixel((nx, ny)) < 100:
-                                has_nearby_text = True
-                                break
-                    if has_nearby_text:
-                        break
-                
-                # 如果在文字附近，轻微变暗
-                if has_nearby_text and random.random() < strength:
-                    r, g, b = result.getpixel((x, y))
-                    result.putpixel((x, y), (
-                        max(0, r - 5),
-                        max(0, g - 5),
-                        max(0, b - 5)
-                    ))
+    pixels = np.array(image)
+    channels = pixels[darken][:, :3].astype(np.int16)
+    pixels[darken, :3] = np.maximum(0, channels - 5).astype(np.uint8)
     
-    return result
+    return Image.fromarray(pixels, image.mode)
@@ -1,152 +1,127 @@
-from PIL import Image, ImageDraw, ImageFilter
+from PIL import Image, ImageDraw
 import random
 import math
 import numpy as np
 
+from .ink_bleed_engine import get_ink_mask, get_scatter_bleed_params, generate_scatter_bleed_alpha, composite_bleed_alpha, generate_distance_bleed_alpha
+from .ink_bleed_engine import get_stroke_boundary, get_edge_bleed_params, draw_edge_bleed_uniforms, generate_edge_bleed_alpha
+from .ink_bleed_engine import get_enhanced_bleed_params
+from .ink_bleed_regions import apply_ink_effect_in_regions
+from .ink_bleed_parallel import apply_ink_effect_tiled
 
-def add_ink_bleed_effect(image, intensity=0.3, imageMode="RGBA"):
-    """修复版墨迹渗透效果 - 强度差异明显"""
-    width, height = image.size
-
-    # 创建透明渗透层
-    bleed_layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(bleed_layer)
-
-    # 灰度图用于识别文字区域
-    gray_image = image.convert('L')
 
+def add_ink_bleed_effect(image, intensity=0.3, imageMode="RGBA", seed=None, regions=None):
+    """修复版墨迹渗透效果 - 强度差异明显（NumPy 向量化引擎）"""
     # 根据强度调整参数
-    bleed_range = max(1, int(3 * intensity))  # 渗透范围随强度变化
-    max_alpha = int(80 * intensity)           # 最大透明度随强度变化
-    min_alpha = int(20 * intensity)           # 最小透明度随强度变化
-    
-    print(f"[修复版] 强度 {intensity}: 范围={bleed_range}, Alpha={min_alpha}-{max_alpha}")
+    params = get_scatter_bleed_params(intensity)
 
-    for x in range(0, width, 2):  # 跳采样提高性能
-        for y in range(0, height, 2):
-            if gray_image.getpixel((x, y)) < 100:  # 深色区域（文字）
-                # 根据强度决定渗透次数
-                bleed_count = max(1, int(5 * intensity))
-                
-                for _ in range(bleed_count):
-                    # 渗透方向和距离
-                    angle = random.uniform(0, 2 * math.pi)
-                    distance = random.randint(1, bleed_range)
-                    
-                    nx = int(x + distance * math.cos(angle))
-                    ny = int(y + distance * math.sin(angle))
-                    
-                    if 0 <= nx < width and 0 <= ny < height:
-                        # Alpha值基于强度
-                        alpha = random.randint(min_alpha, max_alpha)
-                        radius = random.randint(1, 2)
-                        
-                        draw.ellipse((nx - radius, ny - radius, nx + radius, ny + radius),
-                                    fill=(0, 0, 0, alpha))
+    if regions is not None:
+        # 只处理墨迹区域：扩展 = 渗透距离 + 圆点半径 + 模糊范围
+        return apply_ink_effect_in_regions(image, add_ink_bleed_effect, regions, params['halo'],
+                                           "RGB" if imageMode == "RGB" else "RGBA",
+                                           intensity=intensity, imageMode=imageMode, seed=seed)
 
-    # 根据强度调整模糊程度
-    blur_radius = 0.5 + intensity * 1.0
-    bleed_layer = bleed_layer.filter(ImageFilter.GaussianBlur(blur_radius))
+    # 文字掩码用于识别文字区域
+    text_mask = get_ink_mask(image)
+    
+    print(f"[修复版] 强度 {intensity}: 范围={params['bleed_range']}, Alpha={params['min_alpha']}-{params['max_alpha']}")
 
-    # 确保原图为 RGBA 模式
-    base_rgba = image.convert('RGBA')
+    # 批量生成随机渗透点（跳采样，与逐像素版本一致）
+    rng = np.random.default_rng(seed)
+    bleed_alpha = generate_scatter_bleed_alpha(text_mask, params['bleed_range'], params['bleed_count'],
+                                               params['min_alpha'], params['max_alpha'], rng, step=2)
 
     # 应用渗透叠加
-    result = Image.alpha_composite(base_rgba, bleed_layer)
-
-    if imageMode == "RGB":
-        return result.convert('RGB')
-    else:
-        return result
-
-def add_ink_bleed_effect_optimized(image, intensity=0.5, image_mode="RGBA"):
-    """修复版优化墨迹渗透效果 - 强度差异明显"""
-    width, height = image.size
+    return composite_bleed_alpha(image, bleed_alpha, params['blur_radius'], imageMode)
 
-    # 使用numpy提高性能
-    base_array = np.array(image.convert('RGBA'))
+def add_ink_bleed_effect_optimized(image, intensity=0.5, image_mode="RGBA", regions=None,
+                                   seed=None, workers=None, tile_size=512):
+    """
+    修复版优化墨迹渗透效果 - 强度差异明显
     
-    # 创建渗透层
-    bleed_array = np.zeros((height, width, 4), dtype=np.uint8)
+    Args:
+        image: 输入图像
+        intensity: 渗透强度
+        image_mode: 输出图像模式
+        regions: 墨迹区域 - None 处理整幅画布，"auto" 自动检测，或包围盒列表
+        seed: 随机种子
+        workers: 分块并行的进程数 - None 不分块，1 分块顺序执行，>1 进程池并行
+        tile_size: 分块大小
+    """
+    # 🔧 修复1: 增强参数映射（影响范围 = 最大圆点半径 + 模糊范围）
+    params = get_edge_bleed_params(intensity)
+    halo = params['halo']
+    output_mode = "RGB" if image_mode == "RGB" else "RGBA"
+    
+    if workers is not None:
+        # 分块并行：每块带边距，按分块坐标派生种子，结果与进程数无关
+        return apply_ink_effect_tiled(image, add_ink_bleed_effect_optimized, halo, tile_size, workers, seed,
+                                      output_mode, intensity=intensity, image_mode=image_mode)
+    
+    if regions is not None:
+        # 只处理墨迹区域
+        return apply_ink_effect_in_regions(image, add_ink_bleed_effect_optimized, regions, halo, output_mode,
+                                           intensity=intensity, image_mode=image_mode, seed=seed)
+
+    rng = np.random.default_rng(seed)
     
     # 识别文字区域（灰度值<100）
-    gray_array = np.array(image.convert('L'))
-    text_mask = gray_array < 100
-    
-    # 🔧 修复1: 增强参数映射
-    intensity_clamped = max(0.1, min(10.0, intensity))  # 限制范围但允许较大值
-    
-    # 🔧 修复2: 重新设计参数计算
-    max_distance = int(2 + 8 * intensity_clamped)       # 大幅增加距离范围
-    base_alpha = int(20 + 80 * intensity_clamped)       # 增强Alpha基准值
-    density = min(1.0, intensity_clamped * 0.5)         # 密度合理映射
-    penetration_power = int(3 + 7 * intensity_clamped)  # 渗透力度
+    text_mask = get_ink_mask(image)
     
-    print(f"[优化修复版] 强度:{intensity} -> 映射后:{intensity_clamped:.1f}")
-    print(f"  参数: 距离={max_distance}, Alpha基准={base_alpha}, 密度={density:.2f}, 力度={penetration_power}")
+    print(f"[优化修复版] 强度:{intensity} -> 映射后:{params['intensity']:.1f}")
+    print(f"  参数: 距离={params['max_distance']}, Alpha基准={params['base_alpha']}, "
+          f"密度={params['density']:.2f}, 力度={params['penetration_power']}")
     
-    # 找到所有文字像素的坐标
-    text_coords = np.argwhere(text_mask)
+    # 🔧 修复3: 只采样笔画边界：墨迹从边界向外渗透，笔画内部被墨色覆盖，无需逐点处理
+    sample_rate = params['sample_rate']
+    boundary = tuple(array[::sample_rate] for array in get_stroke_boundary(text_mask))
     
-    # 🔧 修复3: 增加采样密度
-    sample_rate = max(1, int(10 / intensity_clamped)) if intensity_clamped > 0.5 else 1
-    sampled_coords = text_coords[::sample_rate] if sample_rate > 1 else text_coords
+    print(f"  采样率: {sample_rate}, 边界像素: {len(boundary[0])}/{int(text_mask.sum()) // sample_rate}")
     
-    print(f"  采样率: {sample_rate}, 处理像素: {len(sampled_coords)}/{len(text_coords)}")
-    
-    for coord in sampled_coords:
-        y, x = coord
-        
-        # 🔧 修复4: 基于密度的跳过逻辑
-        if random.random() > density:
-            continue
-            
-        # 🔧 修复5: 增强渗透生成
-        for _ in range(penetration_power):
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.randint(1, max_distance)
-            
-            ny = int(y + distance * math.sin(angle))
-            nx = int(x + distance * math.cos(angle))
-            
-            if 0 <= ny < height and 0 <= nx < width:
-                # 🔧 修复6: 改进的Alpha计算
-                distance_factor = 1.0 - (distance / max_distance)
-                # 添加随机扰动
-                random_factor = 0.7 + 0.6 * random.random()
-                alpha = int(base_alpha * distance_factor * random_factor)
-                alpha = max(10, min(255, alpha))  # 扩展范围到255
-                
-                # 🔧 修复7: 动态半径
-                radius = max(1, int(1 + 3 * intensity_clamped * random.random()))
-                
-                # 在渗透层绘制圆点
-                for dy in range(-radius, radius + 1):
-                    for dx in range(-radius, radius + 1):
-                        cy, ny_val = y + dy, ny + dy  # 修复变量名冲突
-                        cx, nx_val = x + dx, nx + dx
-                        
-                        if 0 <= cy < height and 0 <= cx < width:
-                            if dx*dx + dy*dy <= radius*radius:
-                                # 累积Alpha值，而不是取最大值
-                                current_alpha = bleed_array[cy, cx, 3]
-                                new_alpha = min(255, int(current_alpha) + alpha // 3)
-                                bleed_array[cy, cx, 3] = new_alpha
+    # 🔧 修复4-7: 密度跳过、距离衰减Alpha、动态半径、累积圆点
+    uniforms = draw_edge_bleed_uniforms(len(boundary[0]), params['penetration_power'], rng)
+    bleed_alpha = generate_edge_bleed_alpha(text_mask, boundary, params, uniforms)
     
     # 🔧 修复8: 动态模糊
-    blur_radius = 0.5 + intensity_clamped * 2.0
-    bleed_layer = Image.fromarray(bleed_array, 'RGBA')
-    bleed_layer = bleed_layer.filter(ImageFilter.GaussianBlur(blur_radius))
-    
-    # 合成结果
-    base_rgba = image.convert('RGBA')
-    result = Image.alpha_composite(base_rgba, bleed_layer)
-    
-    if image_mode == "RGB":
-        return result.convert('RGB')
-    else:
-        return result
-    
+    return composite_bleed_alpha(image, bleed_alpha, params['blur_radius'], image_mode)
+
+
+def ink_bleed_sweep(image, intensities=(0.1, 0.3, 0.6, 0.9), image_mode="RGBA", seed=None):
+    """
+    多强度墨迹渗透扫描（add_ink_bleed_effect_optimized 的批量版本，生成器）
+
+    灰度转换、文字掩码、边界坐标和法线只计算一次，所有强度共用同一组随机数，
+    因此各强度的渗透形态一致、只是程度不同；每次只生成一个结果，
+    调用方可以先保存再取下一个，不必同时持有所有结果
+
+    Args:
+        image: 输入图像
+        intensities: 渗透强度列表
+        image_mode: 输出图像模式
+        seed: 随机种子
+
+    Yields:
+        tuple: (强度, 处理后的图像)
+    """
+    all_params = [get_edge_bleed_params(intensity) for intensity in intensities]
+    if not all_params:
+        return
+
+    rng = np.random.default_rng(seed)
+    text_mask = get_ink_mask(image)
+    boundary = get_stroke_boundary(text_mask)
+    uniforms = draw_edge_bleed_uniforms(len(boundary[0]), max(p['penetration_power'] for p in all_params), rng)
+
+    print(f"[渗透扫描] {len(all_params)} 个强度, 边界像素: {len(boundary[0])}")
+
+    for intensity, params in zip(intensities, all_params):
+        sample_rate = params['sample_rate']
+        sampled_boundary = tuple(array[::sample_rate] for array in boundary)
+        sampled_uniforms = {name: values[::sample_rate] for name, values in uniforms.items()}
+
+        bleed_alpha = generate_edge_bleed_alpha(text_mask, sampled_boundary, params, sampled_uniforms)
+        yield intensity, composite_bleed_alpha(image, bleed_alpha, params['blur_radius'], image_mode)
+
 def add_ink_bleed_effect_enhanced(image, intensity=0.5, 
                                vertical_soak=True, 
                                pressure_sensitive=True,
@@ -154,7 +129,12 @@ def add_ink_bleed_effect_enhanced(image, intensity=0.5,
                                speckle_density=0.3,
                                natural_randomness=0.7,
                                multi_layer=True,
-                               image_mode="RGBA"):
+                               image_mode="RGBA",
+                               bleed_mode="splat",
+                               seed=None,
+                               regions=None,
+                               workers=None,
+                               tile_size=512):
     """
     融合版墨迹渗透效果 - 结合自然随机性与物理参数控制
     
@@ -168,24 +148,49 @@ def add_ink_bleed_effect_enhanced(image, intensity=0.5,
         natural_randomness: 自然随机度 (0-1)
         multi_layer: 是否使用多层渗透
         image_mode: 输出图像模式
+        bleed_mode: 渗透算法 - "splat" 逐像素随机散点，"distance" 由一次计算的各向异性距离场
+                    （垂直渗透按 y 方向缩放）查表得到散点的覆盖概率与覆盖值，多层只是重新加权
+                    （平均变暗程度与 splat 一致，计算量与墨迹像素数和层数基本无关）
+        seed: 随机种子
+        regions: 墨迹区域 - None 处理整幅画布，"auto" 自动检测，或包围盒列表
+        workers: 分块并行的进程数 - None 不分块，1 分块顺序执行，>1 进程池并行
+        tile_size: 分块大小
     """
     
     # 参数验证和调整
+    if bleed_mode not in ("splat", "distance"):
+        raise ValueError(f"未知的渗透算法: {bleed_mode}，可选: splat, distance")
     intensity = max(0.1, min(1.0, intensity))
     natural_randomness = max(0.1, min(1.0, natural_randomness))
     speckle_density = max(0, min(1.0, speckle_density))
     
-    width, height = image.size
-    
-    # 转换为RGBA进行处理
-    if image.mode != 'RGBA':
-        base_rgba = image.convert('RGBA')
-    else:
-        base_rgba = image.copy()
-    
-    # 创建渗透图层
-    bleed_layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(bleed_layer)
+    params = get_enhanced_bleed_params(intensity, vertical_soak, multi_layer)
+    
+    if workers is not None or regions is not None:
+        # 渗透只在分块或墨迹区域内计算：边距 = 渗透距离 + 圆点半径 + 模糊范围
+        halo = params['halo']
+        bleed_kwargs = dict(intensity=intensity, vertical_soak=vertical_soak,
+                            pressure_sensitive=pressure_sensitive,
+                            preserve_characters=False, speckle_density=0,
+                            natural_randomness=natural_randomness,
+                            multi_layer=multi_layer, bleed_mode=bleed_mode)
+        if workers is not None:
+            result = apply_ink_effect_tiled(image, add_ink_bleed_effect_enhanced, halo, tile_size, workers,
+                                            seed, "RGBA", **bleed_kwargs)
+        else:
+            result = apply_ink_effect_in_regions(image, add_ink_bleed_effect_enhanced, regions, halo, "RGBA",
+                                                 seed=seed, **bleed_kwargs)
+        
+        # 噪点与文字保护作用于整幅纸张，与整幅处理时一致
+        if speckle_density > 0:
+            result = add_speckle_effect(result, speckle_density, intensity, _get_speckle_rng(seed))
+        if preserve_characters:
+            result = preserve_text_clarity(result, get_ink_mask(image))
+        
+        if image_mode == "RGB":
+            return result.convert('RGB')
+        else:
+            return result
     
     # 获取灰度图像用于文字检测和笔压计算
     gray_image = image.convert('L')
@@ -200,23 +205,52 @@ def add_ink_bleed_effect_enhanced(image, intensity=0.5,
     else:
         pressure_map = np.ones_like(gray_array, dtype=float)
     
-    print(f"[融合版] 强度:{intensity}, 垂直渗透:{vertical_soak}, 笔压感应:{pressure_sensitive}")
+    print(f"[融合版] 强度:{intensity}, 垂直渗透:{vertical_soak}, 笔压感应:{pressure_sensitive}, 模式:{bleed_mode}")
     
-    # 多层渗透机制（我的版本技术）
-    if multi_layer:
-        layer_count = max(1, int(3 * intensity))
+    # 多层渗透与方向性参数（垂直渗透时 y 方向距离更大）
+    layer_count = params['layer_count']
+    horizontal_bias = params['horizontal_bias']
+    vertical_bias = params['vertical_bias']
+    
+    if bleed_mode == "distance":
+        # 距离场模式：一次计算各向异性距离场，各层按距离查表
+        bleed_alpha = generate_distance_bleed_alpha(
+            char_mask, pressure_map, intensity, layer_count, natural_randomness,
+            horizontal_bias, vertical_bias, np.random.default_rng(seed))
     else:
-        layer_count = 1
+        bleed_alpha = _generate_splat_bleed_alpha(
+            char_mask, pressure_map, intensity, layer_count, natural_randomness,
+            horizontal_bias, vertical_bias, random.Random(seed))
+    
+    # 合成渗透效果（方向性模糊：垂直渗透时水平模糊小、垂直模糊大）
+    result = composite_bleed_alpha(image, bleed_alpha, params['blur_radius'], "RGBA", params['blur_filters'])
+    
+    # 噪点效果（您的版本技术增强）
+    if speckle_density > 0:
+        result = add_speckle_effect(result, speckle_density, intensity, _get_speckle_rng(seed))
+    
+    # 文字保护（您的版本技术）
+    if preserve_characters:
+        result = preserve_text_clarity(result, char_mask)
     
-    # 方向性参数（您的版本技术）
-    if vertical_soak:
-        # 垂直渗透：y方向距离更大
-        vertical_bias = 1.5
-        horizontal_bias = 0.7
+    # 输出模式转换
+    if image_mode == "RGB":
+        return result.convert('RGB')
     else:
-        # 各向同性渗透
-        vertical_bias = 1.0
-        horizontal_bias = 1.0
+        return result
+
+def _get_speckle_rng(seed):
+    """噪点的随机数生成器：由 seed 派生独立的随机流（与分块数、进程数无关），seed 为 None 时随机"""
+    return np.random.default_rng(None if seed is None else np.random.SeedSequence(seed).spawn(1)[0])
+
+def _generate_splat_bleed_alpha(char_mask, pressure_map, intensity, layer_count,
+                                natural_randomness, horizontal_bias, vertical_bias, rng=random):
+    """逐像素随机散点渗透（融合版原始算法），返回 uint8 Alpha层"""
+    height, width = char_mask.shape
+    
+    # 渗透层只有Alpha有意义（颜色恒为黑色）
+    bleed_layer = Image.new('L', (width, height), 0)
+    draw = ImageDraw.Draw(bleed_layer)
     
     # 逐层渗透（我的版本技术增强）
     for layer in range(layer_count):
@@ -236,7 +270,7 @@ def add_ink_bleed_effect_enhanced(image, intensity=0.5,
             
             # 基于笔压调整渗透强度（您的版本技术）
             pixel_pressure = pressure_map[y, x]
-            if pixel_pressure < 0.3 and random.random() > 0.5:
+            if pixel_pressure < 0.3 and rng.random() > 0.5:
                 continue  # 低笔压区域减少渗透
             
             # 渗透次数基于强度和笔压
@@ -244,78 +278,63 @@ def add_ink_bleed_effect_enhanced(image, intensity=0.5,
             
             for _ in range(bleed_count):
                 # 随机角度（我的版本技术）
-                angle = random.uniform(0, 2 * math.pi)
+                angle = rng.uniform(0, 2 * math.pi)
                 
                 # 方向性距离调整（您的版本技术 + 我的随机性）
-                base_distance = random.randint(1, base_range)
+                base_distance = rng.randint(1, base_range)
                 
                 # 应用方向偏差
                 dx = base_distance * math.cos(angle) * horizontal_bias
                 dy = base_distance * math.sin(angle) * vertical_bias
                 
                 # 最终位置
-                nx = int(x + dx * (0.8 + 0.4 * random.random()))
-                ny = int(y + dy * (0.8 + 0.4 * random.random()))
+                nx = int(x + dx * (0.8 + 0.4 * rng.random()))
+                ny = int(y + dy * (0.8 + 0.4 * rng.random()))
                 
                 if 0 <= nx < width and 0 <= ny < height:
                     # Alpha值计算（结合笔压和随机性）
-                    base_alpha = random.randint(min_alpha, max_alpha)
+                    base_alpha = rng.randint(min_alpha, max_alpha)
                     distance_factor = 1.0 - (abs(dx) + abs(dy)) / (base_range * 2)
                     pressure_factor = 0.5 + 0.5 * pixel_pressure
                     final_alpha = int(base_alpha * distance_factor * pressure_factor)
                     
                     # 半径基于强度和随机性
-                    radius = max(1, int(1 + 2 * layer_intensity * random.random()))
+                    radius = max(1, int(1 + 2 * layer_intensity * rng.random()))
                     
                     # 绘制渗透点
                     draw.ellipse((nx - radius, ny - radius, nx + radius, ny + radius),
-                                fill=(0, 0, 0, final_alpha))
-    
-    # 方向性模糊（您的版本技术增强）
-    if vertical_soak:
-        # 垂直渗透：水平模糊小，垂直模糊大
-        bleed_layer = bleed_layer.filter(ImageFilter.GaussianBlur(radius=0.3))
-        bleed_layer = bleed_layer.filter(ImageFilter.BoxBlur(2))
-    else:
-        # 各向同性模糊
-        blur_radius = 0.5 + intensity * 1.0
-        bleed_layer = bleed_layer.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-    
-    # 合成渗透效果
-    result = Image.alpha_composite(base_rgba, bleed_layer)
+                                fill=final_alpha)
     
-    # 噪点效果（您的版本技术增强）
-    if speckle_density > 0:
-        result = add_speckle_effect(result, speckle_density, intensity)
+    return np.array(bleed_layer)
+
+def add_speckle_effect(image, density, intensity, rng=None):
+    """
+    添加噪点效果（增强版）
     
-    # 文字保护（您的版本技术）
-    if preserve_characters:
-        result = preserve_text_clarity(result, char_mask)
+    随机位置中较亮的像素有 30% 的概率变暗，rng 决定噪点位置与强度（同一像素可被多次变暗）
+    """
+    if rng is None:
+        rng = np.random.default_rng()
     
-    # 输出模式转换
-    if image_mode == "RGB":
-        return result.convert('RGB')
-    else:
-        return result
-
-def add_speckle_effect(image, density, intensity):
-    """添加噪点效果（增强版）"""
     width, height = image.size
     img_array = np.array(image)
     
     # 噪点数量基于密度和图像大小
     speckle_count = int(width * height * density * 0.01)
-    
-    for _ in range(speckle_count):
-        x = random.randint(0, width - 1)
-        y = random.randint(0, height - 1)
-        
-        # 只在较亮区域添加噪点
-        if np.mean(img_array[y, x]) > 180:
-            if random.random() < 0.3:
-                # 噪点强度基于主强度
-                darken_amount = random.randint(5, int(25 * intensity))
-                img_array[y, x] = np.clip(img_array[y, x] - darken_amount, 0, 255)
+    xs = rng.integers(0, width, speckle_count)
+    ys = rng.integers(0, height, speckle_count)
+    
+    # 只在较亮区域添加噪点
+    bright = img_array[ys, xs].reshape(speckle_count, -1).mean(axis=1) > 180
+    chosen = bright & (rng.random(speckle_count) < 0.3)
+    
+    # 噪点强度基于主强度（至少为 5）
+    darken_amount = rng.integers(5, max(5, int(25 * intensity)) + 1, speckle_count)
+    darkening = np.zeros((height, width), dtype=np.int64)
+    np.add.at(darkening, (ys[chosen], xs[chosen]), darken_amount[chosen])
+    if img_array.ndim == 3:
+        darkening = darkening[..., None]
+    img_array = np.clip(img_array - darkening, 0, 255).astype(np.uint8)
     
     return Image.fromarray(img_array)
 
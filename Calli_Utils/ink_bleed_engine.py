@@ -0,0 +1,640 @@
+from PIL import Image, ImageDraw, ImageFilter
+import math
+import numpy as np
+
+
+def get_ink_mask(image, threshold=100):
+    """获取文字（墨迹）掩码：灰度值小于阈值的像素为 True"""
+    return np.array(image.convert('L')) < threshold
+
+
+def dilate_mask(mask, radius):
+    """
+    布尔掩码的方形膨胀（(2r+1)×(2r+1) 最大值滤波），按行、列分离计算
+
+    超出画布的部分不参与计算，与逐像素检查邻域并跳过越界像素的结果一致
+    """
+    if radius <= 0:
+        return mask.copy()
+    result = mask.copy()
+    for shift in range(1, radius + 1):
+        result[:, shift:] |= mask[:, :-shift]
+        result[:, :-shift] |= mask[:, shift:]
+    rows = result.copy()
+    for shift in range(1, radius + 1):
+        result[shift:] |= rows[:-shift]
+        result[:-shift] |= rows[shift:]
+    return result
+
+
+def get_stroke_boundary(ink_mask):
+    """
+    提取笔画边界像素及其外法线
+
+    边界 = 掩码 XOR 3×3 腐蚀后的掩码（画布外视为纸张），
+    外法线取平滑掩码梯度的反方向
+
+    Returns:
+        tuple: (边界 y 坐标, x 坐标, 外法线 y 分量, x 分量)，按行优先顺序排列
+    """
+    padded = np.pad(ink_mask, 1)
+    eroded = ~dilate_mask(~padded, 1)[1:-1, 1:-1]
+    ys, xs = np.nonzero(ink_mask & ~eroded)
+
+    smooth_mask = Image.fromarray(ink_mask.astype(np.uint8) * 255).filter(ImageFilter.BoxBlur(2))
+    gradient_y, gradient_x = np.gradient(np.array(smooth_mask, dtype=np.float32))
+    normal_y, normal_x = -gradient_y[ys, xs], -gradient_x[ys, xs]
+    length = np.hypot(normal_y, normal_x)
+    length[length == 0] = np.inf
+
+    return ys, xs, normal_y / length, normal_x / length
+
+
+def get_disc_offsets(radius, slack=0.8):
+    """
+    获取圆点的像素偏移量
+
+    使用 dx² + dy² <= r(r + slack) 的规则：slack=0.8 与 ImageDraw.ellipse 在 r=1~4 时的
+    栅格化结果一致，slack=0 即 dx² + dy² <= r²
+
+    Returns:
+        tuple: (dy数组, dx数组)
+    """
+    radius = int(radius)
+    dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    inside = dx * dx + dy * dy <= radius * (radius + slack)
+    return dy[inside], dx[inside]
+
+
+def stamp_discs(buffer, ys, xs, values, radii, mode="set", slack=0.8):
+    """
+    在二维缓冲区上批量绘制圆点（整体数组运算，无逐点Python循环）
+
+    Args:
+        buffer: 二维 numpy 数组（原地修改）
+        ys, xs: 圆心坐标数组
+        values: 每个圆点的数值
+        radii: 每个圆点的半径（按半径分组处理）
+        mode: "set" 覆盖写入（同 ImageDraw 填充），"add" 累加，"max" 取最大值
+        slack: 圆点栅格化规则，见 get_disc_offsets
+
+    Returns:
+        buffer: 修改后的缓冲区
+    """
+    height, width = buffer.shape
+
+    ys = np.asarray(ys, dtype=np.int64)
+    xs = np.asarray(xs, dtype=np.int64)
+    values = np.broadcast_to(np.asarray(values), ys.shape)
+    radii = np.broadcast_to(np.asarray(radii, dtype=np.int64), ys.shape)
+    if len(ys) == 0:
+        return buffer
+
+    # 四周留出两倍最大半径的边距：与画布相交的圆点（圆心可在画布外一个半径内）
+    # 越界部分都落在边距内，省去逐点边界检查
+    pad = 2 * int(radii.max())
+    padded_width = width + 2 * pad
+    padded = np.pad(buffer, pad)
+    flat_buffer = padded.reshape(-1)
+
+    # 只保留与画布相交的圆点
+    visible = (ys >= -radii) & (ys < height + radii) & (xs >= -radii) & (xs < width + radii)
+    centers = (ys + pad) * padded_width + (xs + pad)
+
+    for radius in np.unique(radii[visible]):
+        selected = visible & (radii == radius)
+        dy, dx = get_disc_offsets(radius, slack)
+        flat_index = (centers[selected][:, None] + (dy * padded_width + dx)[None, :]).ravel()
+        flat_values = np.repeat(values[selected], len(dy))
+
+        if mode == "set":
+            flat_buffer[flat_index] = flat_values
+        elif mode == "add":
+            total = np.bincount(flat_index, weights=flat_values, minlength=flat_buffer.size)
+            if np.issubdtype(buffer.dtype, np.integer):
+                limit = np.iinfo(buffer.dtype).max
+                flat_buffer[:] = np.minimum(limit, flat_buffer + total).astype(buffer.dtype)
+            else:
+                flat_buffer += total.astype(buffer.dtype)
+        elif mode == "max":
+            np.maximum.at(flat_buffer, flat_index, flat_values.astype(buffer.dtype))
+        else:
+            raise ValueError(f"未知的绘制模式: {mode}")
+
+    buffer[:] = padded[pad:pad + height, pad:pad + width]
+    return buffer
+
+
+def get_scatter_bleed_params(intensity):
+    """
+    add_ink_bleed_effect 的强度参数映射
+
+    Returns:
+        dict: bleed_range 渗透范围, bleed_count 渗透次数, min_alpha/max_alpha Alpha范围,
+              blur_radius 模糊半径, halo 渗透影响的最大范围（含圆点半径与模糊）
+    """
+    bleed_range = max(1, int(3 * intensity))  # 渗透范围随强度变化
+    blur_radius = 0.5 + intensity * 1.0       # 模糊程度随强度变化
+    return {
+        'bleed_range': bleed_range,
+        'bleed_count': max(1, int(5 * intensity)),  # 根据强度决定渗透次数
+        'min_alpha': int(20 * intensity),           # 最小透明度随强度变化
+        'max_alpha': int(80 * intensity),           # 最大透明度随强度变化
+        'blur_radius': blur_radius,
+        'halo': bleed_range + 2 + int(math.ceil(3 * blur_radius))
+    }
+
+
+def generate_scatter_bleed_alpha(text_mask, bleed_range, bleed_count, min_alpha, max_alpha,
+                                 rng=None, step=2):
+    """
+    生成随机散点渗透的Alpha层（add_ink_bleed_effect 的向量化实现）
+
+    每个采样到的文字像素向随机方向、随机距离（1~bleed_range）散布 bleed_count 个小圆点，
+    圆点半径1~2，Alpha在 min_alpha~max_alpha 之间随机，后绘制的圆点覆盖先绘制的
+
+    Args:
+        text_mask: 文字掩码（布尔数组）
+        bleed_range: 最大渗透距离
+        bleed_count: 每个文字像素的渗透次数
+        min_alpha, max_alpha: Alpha范围
+        rng: numpy 随机数生成器
+        step: 采样步长（与原版隔行隔列采样一致）
+
+    Returns:
+        numpy.ndarray: uint8 Alpha层
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    height, width = text_mask.shape
+    bleed_alpha = np.zeros((height, width), dtype=np.uint8)
+
+    ys, xs = np.nonzero(text_mask[::step, ::step])
+    if len(ys) == 0:
+        return bleed_alpha
+
+    ys = np.repeat(ys * step, bleed_count)
+    xs = np.repeat(xs * step, bleed_count)
+    count = len(ys)
+
+    # 一次性生成所有随机量
+    angles = rng.uniform(0, 2 * math.pi, count)
+    distances = rng.integers(1, bleed_range + 1, count)
+    alphas = rng.integers(min_alpha, max_alpha + 1, count)
+    radii = rng.integers(1, 3, count)
+
+    nx = np.trunc(xs + distances * np.cos(angles)).astype(np.int64)
+    ny = np.trunc(ys + distances * np.sin(angles)).astype(np.int64)
+
+    inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+    stamp_discs(bleed_alpha, ny[inside], nx[inside], alphas[inside].astype(np.uint8),
+                radii[inside], mode="set")
+
+    return bleed_alpha
+
+
+def get_edge_bleed_params(intensity):
+    """
+    add_ink_bleed_effect_optimized 的强度参数映射
+
+    Returns:
+        dict: 映射后强度、渗透距离、Alpha基准、密度、力度、采样率、最大圆点半径、模糊半径、影响范围
+    """
+    intensity_clamped = max(0.1, min(10.0, intensity))  # 限制范围但允许较大值
+    max_radius = int(1 + 3 * intensity_clamped)
+    blur_radius = 0.5 + intensity_clamped * 2.0
+    return {
+        'intensity': intensity_clamped,
+        'max_distance': int(2 + 8 * intensity_clamped),       # 大幅增加距离范围
+        'base_alpha': int(20 + 80 * intensity_clamped),       # 增强Alpha基准值
+        'density': min(1.0, intensity_clamped * 0.5),         # 密度合理映射
+        'penetration_power': int(3 + 7 * intensity_clamped),  # 渗透力度
+        'sample_rate': max(1, int(10 / intensity_clamped)) if intensity_clamped > 0.5 else 1,
+        'max_radius': max_radius,
+        'blur_radius': blur_radius,
+        'halo': max_radius + 1 + int(math.ceil(3 * blur_radius))
+    }
+
+
+def get_splat_bleed_reach(layer_intensity, horizontal_bias=1.0, vertical_bias=1.0):
+    """
+    融合版散点渗透单层的最大影响范围（像素）：跳跃距离 × 方向偏差 × 最大抖动 + 圆点半径
+
+    Returns:
+        int: 散点覆盖的最大偏移（含1像素取整余量）
+    """
+    base_range = max(1, int(3 * layer_intensity))
+    max_radius = max(1, int(1 + 2 * layer_intensity))
+    return int(math.ceil(base_range * 1.2 * max(horizontal_bias, vertical_bias, 1.0))) + max_radius + 1
+
+
+def get_enhanced_bleed_params(intensity, vertical_soak=True, multi_layer=True):
+    """
+    add_ink_bleed_effect_enhanced 的参数映射
+
+    Returns:
+        dict: layer_count 渗透层数, horizontal_bias/vertical_bias 方向偏差,
+              blur_radius 模糊半径, blur_filters 模糊滤镜,
+              halo 渗透影响的最大范围（含圆点半径与模糊）
+    """
+    if vertical_soak:
+        # 垂直渗透：y方向距离更大，水平模糊小、垂直模糊大
+        horizontal_bias, vertical_bias = 0.7, 1.5
+        blur_radius = 3
+        blur_filters = [ImageFilter.GaussianBlur(radius=0.3), ImageFilter.BoxBlur(2)]
+        blur_reach = int(math.ceil(3 * 0.3)) + 2
+    else:
+        # 各向同性渗透与模糊
+        horizontal_bias, vertical_bias = 1.0, 1.0
+        blur_radius = 0.5 + intensity * 1.0
+        blur_filters = [ImageFilter.GaussianBlur(radius=blur_radius)]
+        blur_reach = int(math.ceil(3 * blur_radius))
+
+    return {
+        'layer_count': max(1, int(3 * intensity)) if multi_layer else 1,
+        'horizontal_bias': horizontal_bias,
+        'vertical_bias': vertical_bias,
+        'blur_radius': blur_radius,
+        'blur_filters': blur_filters,
+        # 最后一层强度最大，影响范围也最大
+        'halo': get_splat_bleed_reach(intensity, horizontal_bias, vertical_bias) + blur_reach
+    }
+
+
+def draw_edge_bleed_uniforms(point_count, penetration_power, rng):
+    """
+    一次性生成边界渗透所需的全部均匀随机数
+
+    多个强度共用同一组随机数（各取所需的行和列），渗透形态随强度连续变化
+
+    Returns:
+        dict: keep (点数,)，angle / distance / factor / radius (点数, 力度)
+    """
+    shape = (point_count, penetration_power)
+    return {
+        'keep': rng.random(point_count),
+        'angle': rng.random(shape),
+        'distance': rng.random(shape),
+        'factor': rng.random(shape),
+        'radius': rng.random(shape)
+    }
+
+
+def generate_edge_bleed_alpha(text_mask, boundary, params, uniforms):
+    """
+    由笔画边界生成累积式渗透Alpha层（add_ink_bleed_effect_optimized 的向量化实现）
+
+    边界内侧 radius 层以内的文字像素，其圆点也会露出笔画：每次渗透沿外法线向内铺
+    radius 个圆点，代替这些内部像素的采样；更深的笔画内部直接填入逐点采样时累积的
+    期望Alpha（被墨色覆盖，只影响模糊后的边缘）
+
+    Args:
+        text_mask: 文字掩码
+        boundary: 已按采样率抽取的边界 (ys, xs, 外法线y, 外法线x)
+        params: get_edge_bleed_params 的结果
+        uniforms: 与边界点逐行对应的均匀随机数，列数不少于渗透力度
+
+    Returns:
+        numpy.ndarray: uint8 Alpha层
+    """
+    height, width = text_mask.shape
+    edge_ys, edge_xs, normal_ys, normal_xs = boundary
+    max_distance = params['max_distance']
+    base_alpha = params['base_alpha']
+    power = params['penetration_power']
+
+    # 基于密度的跳过逻辑
+    kept = np.nonzero(uniforms['keep'] <= params['density'])[0]
+    source = np.repeat(kept, power)
+    draws = lambda name: uniforms[name][kept, :power].ravel()
+
+    # 渗透方向只用于边界检查
+    angle = 2 * math.pi * draws('angle')
+    distance = 1 + (draws('distance') * max_distance).astype(np.int64)
+    target_y = (edge_ys[source] + distance * np.sin(angle)).astype(np.int64)
+    target_x = (edge_xs[source] + distance * np.cos(angle)).astype(np.int64)
+    in_bounds = (target_y >= 0) & (target_y < height) & (target_x >= 0) & (target_x < width)
+
+    # 距离衰减 + 随机扰动的Alpha，动态半径
+    random_factor = 0.7 + 0.6 * draws('factor')
+    alpha = np.clip((base_alpha * (1.0 - distance / max_distance) * random_factor).astype(np.int64), 10, 255)
+    radius = np.maximum(1, (1 + 3 * params['intensity'] * draws('radius')).astype(np.int64))
+
+    source, alpha, radius = source[in_bounds], alpha[in_bounds], radius[in_bounds]
+
+    layers = np.repeat(np.arange(len(source)), radius)
+    depth = np.arange(len(layers)) - np.repeat(np.cumsum(radius) - radius, radius)
+    center_y = edge_ys[source[layers]] - np.rint(depth * normal_ys[source[layers]]).astype(np.int64)
+    center_x = edge_xs[source[layers]] - np.rint(depth * normal_xs[source[layers]]).astype(np.int64)
+
+    # 累积Alpha值（alpha // 3），而不是取最大值
+    bleed_alpha = np.zeros((height, width), dtype=np.float32)
+    stamp_discs(bleed_alpha, center_y, center_x, alpha[layers] // 3, radius[layers], mode="add", slack=0)
+
+    # 笔画内部的期望Alpha
+    distances = np.arange(1, max_distance + 1)[:, None]
+    factors = 0.7 + 0.6 * (np.arange(64) + 0.5) / 64
+    expected_alpha = np.mean(np.clip((base_alpha * (1.0 - distances / max_distance) * factors).astype(int), 10, 255) // 3)
+    radii = np.maximum(1, (1 + 3 * params['intensity'] * (np.arange(256) + 0.5) / 256).astype(int))
+    expected_area = np.mean([len(get_disc_offsets(r, 0)[0]) for r in radii])
+    interior_alpha = params['density'] / params['sample_rate'] * power * expected_alpha * expected_area
+
+    mask_layer = Image.fromarray(text_mask.astype(np.uint8) * 255)
+    coverage = np.array(mask_layer.filter(ImageFilter.BoxBlur(max(1, int(radii.mean())))), dtype=np.float32) / 255
+    bleed_alpha = np.where(text_mask, interior_alpha * coverage, bleed_alpha)
+
+    return np.clip(bleed_alpha, 0, 255).astype(np.uint8)
+
+
+def composite_bleed_alpha(image, bleed_alpha, blur_radius, image_mode="RGBA", blur_filters=None):
+    """
+    将黑色渗透Alpha层模糊后叠加到原图
+
+    只对Alpha通道做模糊，并且只在渗透层的包围盒（加模糊余量）内模糊与合成，
+    结果与整幅RGBA图层模糊后合成一致
+
+    Args:
+        image: 原图
+        bleed_alpha: uint8 Alpha数组
+        blur_radius: 高斯模糊半径（使用 blur_filters 时表示模糊的影响范围）
+        image_mode: 输出图像模式
+        blur_filters: 自定义模糊滤镜列表，默认为 [GaussianBlur(blur_radius)]
+
+    Returns:
+        Image: 合成后的图像
+    """
+    base_rgba = image.convert('RGBA')
+    alpha_image = Image.fromarray(bleed_alpha, 'L')
+    bbox = alpha_image.getbbox()
+
+    if bbox:
+        width, height = base_rgba.size
+        margin = int(math.ceil(3 * blur_radius)) + 2
+        box = (
+            max(0, bbox[0] - margin),
+            max(0, bbox[1] - margin),
+            min(width, bbox[2] + margin),
+            min(height, bbox[3] + margin)
+        )
+
+        if blur_filters is None:
+            blur_filters = [ImageFilter.GaussianBlur(blur_radius)] if blur_radius > 0 else []
+
+        region_alpha = alpha_image.crop(box)
+        for blur_filter in blur_filters:
+            region_alpha = region_alpha.filter(blur_filter)
+
+        bleed_layer = Image.new('RGBA', region_alpha.size, (0, 0, 0, 0))
+        bleed_layer.putalpha(region_alpha)
+        base_rgba.alpha_composite(bleed_layer, dest=box[:2])
+
+    if image_mode == "RGB":
+        return base_rgba.convert('RGB')
+    else:
+        return base_rgba
+
+
+def _get_ellipse_footprint(radius):
+    """draw.ellipse((x - r, y - r, x + r, y + r)) 覆盖的像素偏移"""
+    canvas = Image.new('L', (2 * radius + 1, 2 * radius + 1), 0)
+    ImageDraw.Draw(canvas).ellipse((0, 0, 2 * radius, 2 * radius), fill=1)
+    dy, dx = np.nonzero(np.array(canvas))
+    return dy - radius, dx - radius
+
+
+def get_splat_bleed_kernels(layer_intensity, natural_randomness, horizontal_bias, vertical_bias,
+                            angle_samples=72, jitter_samples=6):
+    """
+    散点渗透（融合版 splat 模式）单个墨迹像素每次散点的期望覆盖核
+
+    按散点模式的同一组参数对随机变量数值积分：跳跃距离 1 ~ base_range、随机角度、
+    方向偏差、±20% 抖动（向下取整）、Alpha 距离衰减 1 - (|dx| + |dy|) / (2·base_range)、
+    圆点半径分布与 PIL 椭圆的实际覆盖像素
+
+    Args:
+        layer_intensity: 当前层强度
+        natural_randomness: 自然随机度
+        horizontal_bias, vertical_bias: 方向偏差
+
+    Returns:
+        tuple: (命中概率核, 期望 Alpha 核（未乘笔压系数）, 核中心 (cy, cx))
+    """
+    base_range = max(1, int(3 * layer_intensity))
+    min_alpha = int(10 + 20 * layer_intensity * natural_randomness)
+    max_alpha = int(40 + 60 * layer_intensity * natural_randomness)
+    mean_alpha = (min_alpha + max_alpha) / 2
+
+    # 半径 = max(1, int(1 + 2·强度·u))，u ~ U[0, 1)
+    spread = 2 * layer_intensity
+    max_radius = max(1, int(1 + spread))
+    radius_probs = {}
+    for radius in range(1, max_radius + 1):
+        upper = 1.0 if radius == max_radius else min(1.0, radius / spread)
+        lower = 0.0 if radius == 1 else min(1.0, (radius - 1) / spread)
+        if upper > lower:
+            radius_probs[radius] = upper - lower
+
+    distances = np.arange(1, base_range + 1, dtype=np.float64)
+    angles = (np.arange(angle_samples) + 0.5) / angle_samples * 2 * math.pi
+    jitter = 0.8 + 0.4 * (np.arange(jitter_samples) + 0.5) / jitter_samples
+    r, theta, jx, jy = [a.ravel() for a in np.meshgrid(distances, angles, jitter, jitter, indexing='ij')]
+    weight = 1.0 / len(r)
+
+    dx = r * np.cos(theta) * horizontal_bias
+    dy = r * np.sin(theta) * vertical_bias
+    offset_x = np.floor(dx * jx).astype(np.int64)
+    offset_y = np.floor(dy * jy).astype(np.int64)
+    alpha = mean_alpha * (1.0 - (np.abs(dx) + np.abs(dy)) / (base_range * 2))
+
+    reach = get_splat_bleed_reach(layer_intensity, horizontal_bias, vertical_bias)
+    size = 2 * reach + 1
+    hit_kernel = np.zeros(size * size)
+    alpha_kernel = np.zeros(size * size)
+    for radius, prob in radius_probs.items():
+        foot_y, foot_x = _get_ellipse_footprint(radius)
+        flat_index = ((offset_y[:, None] + foot_y[None, :] + reach) * size
+                      + (offset_x[:, None] + foot_x[None, :] + reach)).ravel()
+        hit_kernel += np.bincount(flat_index, minlength=size * size) * (weight * prob)
+        alpha_kernel += np.bincount(flat_index, weights=np.repeat(alpha * (weight * prob), len(foot_y)),
+                                    minlength=size * size)
+
+    return hit_kernel.reshape(size, size), alpha_kernel.reshape(size, size), (reach, reach)
+
+
+def get_splat_bleed_profiles(layer_intensity, natural_randomness, horizontal_bias, vertical_bias, reach,
+                             counts=(1.0,)):
+    """
+    散点渗透随距离场偏移变化的覆盖概率与覆盖值（查表用）
+
+    把最近的墨迹边缘近似为直线：纸张像素相对最近墨迹像素的偏移为 (dy, dx) 时，外法线即
+    该偏移在各向异性度量下的方向，命中来自覆盖核中沿外法线投影不小于该距离的部分
+    （水平、垂直边缘时与逐像素散点完全一致）；墨迹像素本身取整个覆盖核。
+    散点按墨迹的扫描顺序绘制、后绘制的覆盖先绘制的，因此覆盖值取最后一次命中的期望 Alpha：
+    覆盖核的每个格子对应一个相对位置的墨迹，按扫描顺序从后往前，本格命中且其后的格子都未命中
+
+    Args:
+        layer_intensity: 当前层强度
+        natural_randomness: 自然随机度
+        horizontal_bias, vertical_bias: 方向偏差（与距离场的度量一致）
+        reach: 距离场的最大偏移（像素）
+        counts: 每个墨迹像素的期望散点次数（每个取值单独成表）
+
+    Returns:
+        tuple: (覆盖概率表, 覆盖值表（未乘笔压系数）)，形状 (len(counts), 2·reach + 1, 2·reach + 1)，
+               按 [次数序号, dy + reach, dx + reach] 索引
+    """
+    hit_kernel, alpha_kernel, (cy, cx) = get_splat_bleed_kernels(layer_intensity, natural_randomness,
+                                                                 horizontal_bias, vertical_bias)
+    ky, kx = np.nonzero(hit_kernel)
+    # 扫描顺序：墨迹 = 像素 - 偏移，偏移的 (y, x) 越小，墨迹越晚绘制
+    order = np.lexsort((-(kx - cx), -(ky - cy)))
+    ky, kx = ky[order], kx[order]
+    hits, alphas = hit_kernel[ky, kx], alpha_kernel[ky, kx]
+    kernel_x, kernel_y = (kx - cx) / horizontal_bias, (ky - cy) / vertical_bias
+
+    offset_y, offset_x = np.mgrid[-reach:reach + 1, -reach:reach + 1]
+    normal_x, normal_y = (offset_x / horizontal_bias).ravel(), (offset_y / vertical_bias).ravel()
+    distance_sq = normal_x ** 2 + normal_y ** 2
+    # 投影 ≥ 距离  ⇔  核偏移 · 偏移 ≥ 距离²（均在缩放后的坐标中）
+    reached = (np.outer(normal_x, kernel_x) + np.outer(normal_y, kernel_y)) >= distance_sq[:, None] - 1e-9
+    reached[reach * (2 * reach + 1) + reach] = True
+
+    cover_probs, cover_values = [], []
+    for count in counts:
+        hit_counts = reached * (count * hits)
+        later = np.cumsum(hit_counts[:, ::-1], axis=1)[:, ::-1] - hit_counts
+        last = (1 - np.exp(-hit_counts)) * np.exp(-later)
+        cover_prob = 1 - np.exp(-hit_counts.sum(axis=1))
+        cover_probs.append(cover_prob)
+        cover_values.append((last @ (alphas / hits)) / np.maximum(cover_prob, 1e-12))
+
+    shape = (len(counts), 2 * reach + 1, 2 * reach + 1)
+    return np.reshape(cover_probs, shape), np.reshape(cover_values, shape)
+
+
+def compute_ink_distance(ink_mask, pressure_map, reach, horizontal_bias=1.0, vertical_bias=1.0):
+    """
+    各向异性距离场：每个像素到最近墨迹像素的距离 √((dx/水平偏差)² + (dy/垂直偏差)²)
+
+    先逐列求竖直方向最近的墨迹，再逐行在 ±reach 列内取最小，两次一维扫描得到精确结果；
+    同时记录到最近墨迹像素的偏移及其笔压
+
+    Args:
+        ink_mask: 墨迹掩码
+        pressure_map: 笔压映射
+        reach: 最大偏移（像素），超出的像素视为不受影响
+        horizontal_bias, vertical_bias: 方向偏差（垂直渗透时 y 方向距离按更大的偏差缩小）
+
+    Returns:
+        tuple: (距离, 偏移 dy, 偏移 dx, 最近墨迹的笔压)；偏移为像素坐标减最近墨迹坐标，
+               超出范围的像素距离为 inf
+    """
+    height, width = ink_mask.shape
+    far = reach + 1
+
+    # 1. 逐列：竖直方向最近墨迹的偏移与其笔压
+    padded_ink = np.pad(ink_mask, ((reach, reach), (0, 0)))
+    padded_pressure = np.pad(pressure_map.astype(np.float32), ((reach, reach), (0, 0)))
+    column_offset = np.full((height, width), far, dtype=np.int32)
+    column_pressure = np.zeros((height, width), dtype=np.float32)
+    for gap in range(reach + 1):
+        for shift in ((gap, -gap) if gap else (0,)):
+            rows = slice(reach + shift, reach + shift + height)
+            found = padded_ink[rows] & (column_offset == far)
+            column_offset[found] = -shift
+            column_pressure[found] = padded_pressure[rows][found]
+
+    # 2. 逐行：在 ±reach 列内取各向异性距离最小者
+    padded_offset = np.pad(column_offset, ((0, 0), (reach, reach)), constant_values=far)
+    padded_pressure = np.pad(column_pressure, ((0, 0), (reach, reach)))
+    distance_sq = np.full((height, width), np.inf, dtype=np.float32)
+    offset_y = np.zeros((height, width), dtype=np.int32)
+    offset_x = np.zeros((height, width), dtype=np.int32)
+    pressure = np.zeros((height, width), dtype=np.float32)
+    for shift in range(-reach, reach + 1):
+        cols = slice(reach + shift, reach + shift + width)
+        column = padded_offset[:, cols]
+        candidate = (shift / horizontal_bias) ** 2 + (column / vertical_bias) ** 2
+        better = (column != far) & (candidate < distance_sq)
+        distance_sq[better] = candidate[better]
+        offset_y[better] = column[better]
+        offset_x[better] = -shift
+        pressure[better] = padded_pressure[:, cols][better]
+
+    return np.sqrt(distance_sq), offset_y, offset_x, pressure
+
+
+def generate_distance_bleed_alpha(ink_mask, pressure_map, intensity, layer_count=1,
+                                  natural_randomness=0.7, horizontal_bias=1.0, vertical_bias=1.0,
+                                  rng=None):
+    """
+    距离场渗透Alpha层（add_ink_bleed_effect_enhanced 的 "distance" 模式）
+
+    不逐个绘制散点：只计算一次各向异性距离场（垂直渗透由 y 方向缩放的度量表示），
+    每层按到最近墨迹的偏移与该墨迹的笔压查表，得到散点模式下本层覆盖该像素的概率与
+    覆盖值，多层渗透只是对同一距离场重新加权：被本层覆盖的像素取新值，否则保留前一层的值；
+    最后乘随机扰动场
+
+    Args:
+        ink_mask: 墨迹掩码
+        pressure_map: 笔压映射 (0-1)
+        intensity: 渗透强度
+        layer_count: 渗透层数
+        natural_randomness: 自然随机度 (0-1)
+        horizontal_bias, vertical_bias: 方向偏差
+        rng: numpy 随机数生成器
+
+    Returns:
+        numpy.ndarray: uint8 Alpha层
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    height, width = ink_mask.shape
+    bleed_alpha = np.zeros((height, width), dtype=np.float32)
+    if not ink_mask.any():
+        return bleed_alpha.astype(np.uint8)
+
+    # 最后一层强度最大，影响范围也最大
+    reach = get_splat_bleed_reach(intensity, horizontal_bias, vertical_bias)
+
+    # 只在墨迹包围盒（加渗透范围）内计算
+    rows = np.nonzero(ink_mask.any(axis=1))[0]
+    cols = np.nonzero(ink_mask.any(axis=0))[0]
+    top, bottom = max(0, rows[0] - reach), min(height, rows[-1] + reach + 1)
+    left, right = max(0, cols[0] - reach), min(width, cols[-1] + reach + 1)
+
+    # 抗锯齿的笔画边缘笔压低，而散点主要来自其内侧的墨迹：源笔压取 3×3 邻域内的最大值
+    ink = ink_mask[top:bottom, left:right]
+    pressure = np.where(ink, np.clip(pressure_map[top:bottom, left:right], 0, 1), 0)
+    pressure = np.array(Image.fromarray(np.rint(pressure * 255).astype(np.uint8)).filter(ImageFilter.MaxFilter(3)),
+                        dtype=np.float32) / 255
+
+    distance, offset_y, offset_x, pressure = compute_ink_distance(ink, pressure, reach,
+                                                                  horizontal_bias, vertical_bias)
+    reached = np.isfinite(distance)
+    offset_y, offset_x, pressure = offset_y[reached] + reach, offset_x[reached] + reach, pressure[reached]
+
+    # 低笔压（< 0.3）的墨迹像素有一半概率跳过
+    source = np.where(pressure < 0.3, 0.5, 1.0)
+    pressure_factor = 0.5 + 0.5 * pressure
+
+    values = np.zeros(len(pressure))
+    for layer in range(layer_count):
+        layer_intensity = intensity * (layer + 1) / layer_count
+        counts = source * np.maximum(1, np.floor(3 * layer_intensity * pressure * natural_randomness))
+        count_values, count_index = np.unique(counts, return_inverse=True)
+        cover_prob, cover_value = get_splat_bleed_profiles(layer_intensity, natural_randomness, horizontal_bias,
+                                                           vertical_bias, reach, count_values)
+        # 按覆盖概率抽样（与散点一样是整像素的覆盖，避免小期望值被取整抹掉）
+        covered = rng.random(len(counts)) < cover_prob[count_index, offset_y, offset_x]
+        values = np.where(covered, cover_value[count_index, offset_y, offset_x] * pressure_factor, values)
+
+    region = np.zeros(distance.shape)
+    region[reached] = values
+
+    # 随机扰动场，均值为1，幅度由自然随机度控制
+    noise = (1 - natural_randomness) + 2 * natural_randomness * rng.random(region.shape, dtype=np.float32)
+    bleed_alpha[top:bottom, left:right] = region * noise
+    return np.clip(bleed_alpha, 0, 255).astype(np.uint8)
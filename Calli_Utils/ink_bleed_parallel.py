@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+import numpy as np
+
+from .ink_bleed_engine import get_ink_mask
+from .ink_bleed_regions import expand_region
+
+
+def split_into_tiles(width, height, tile_size=512):
+    """将画布切分为 tile_size 大小的分块，返回 [(x0, y0, x1, y1), ...]"""
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in range(0, height, tile_size)
+        for x in range(0, width, tile_size)
+    ]
+
+
+def derive_tile_seed(seed, tile_box):
+    """由基础种子和分块左上角坐标派生分块种子，与进程数、执行顺序无关"""
+    return int(np.random.SeedSequence([seed, tile_box[0], tile_box[1]]).generate_state(1)[0])
+
+
+def _run_tile(task):
+    """进程池中执行单个分块：对带边距的分块运行效果，只返回核心区域"""
+    effect, tile_image, kwargs, core_box = task
+    return effect(tile_image, **kwargs).crop(core_box)
+
+
+def apply_ink_effect_tiled(image, effect, halo, tile_size=512, workers=None, seed=None,
+                           output_mode=None, **kwargs):
+    """
+    分块并行执行墨迹效果（进程池），拼接后无接缝
+
+    每个分块四周带 halo 像素的边距（最大渗透距离 + 模糊半径），分块内部的结果
+    与整幅处理一致；只粘回分块核心区域。不含墨迹的分块直接跳过。
+
+    Args:
+        image: 输入图像
+        effect: 墨迹效果函数 effect(image, seed=..., **kwargs)，需为模块级函数
+        halo: 分块边距
+        tile_size: 分块大小
+        workers: 进程数，None 为CPU核数，1 为单进程顺序执行
+        seed: 基础随机种子（None 则随机选取），结果与进程数无关
+        output_mode: 输出图像模式（默认与输入一致）
+        **kwargs: 传给效果函数的其他参数
+
+    Returns:
+        Image: 处理后的图像
+    """
+    width, height = image.size
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+
+    ink_mask = get_ink_mask(image)
+
+    tasks = []
+    positions = []
+    for tile_box in split_into_tiles(width, height, tile_size):
+        crop_box = expand_region(tile_box, halo, width, height)
+        if not ink_mask[crop_box[1]:crop_box[3], crop_box[0]:crop_box[2]].any():
+            continue
+
+        core_box = (
+            tile_box[0] - crop_box[0], tile_box[1] - crop_box[1],
+            tile_box[2] - crop_box[0], tile_box[3] - crop_box[1]
+        )
+        tile_kwargs = dict(kwargs, seed=derive_tile_seed(seed, tile_box))
+        tasks.append((effect, image.crop(crop_box), tile_kwargs, core_box))
+        positions.append(tile_box[:2])
+
+    print(f"  分块并行: {len(tasks)} 个含墨迹分块, 分块大小 {tile_size}, 边距 {halo}, 进程数 {workers}")
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            outputs = list(executor.map(_run_tile, tasks))
+    else:
+        outputs = [_run_tile(task) for task in tasks]
+
+    result = image.convert(output_mode or image.mode)
+    for position, output in zip(positions, outputs):
+        result.paste(output.convert(result.mode), position)
+
+    return result
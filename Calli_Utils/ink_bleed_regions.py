@@ -0,0 +1,132 @@
+import numpy as np
+
+from .ink_bleed_engine import get_ink_mask
+
+
+def expand_region(box, halo, width, height):
+    """将包围盒向四周扩展 halo 像素，并限制在画布范围内"""
+    x0, y0, x1, y1 = box
+    return (
+        max(0, int(x0) - halo),
+        max(0, int(y0) - halo),
+        min(width, int(x1) + halo),
+        min(height, int(y1) + halo)
+    )
+
+
+def merge_regions(regions):
+    """合并相互重叠的包围盒，直到没有重叠为止"""
+    merged = [tuple(box) for box in regions if box[2] > box[0] and box[3] > box[1]]
+
+    changed = True
+    while changed:
+        changed = False
+        result = []
+        for box in merged:
+            for i, other in enumerate(result):
+                if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+                    result[i] = (
+                        min(box[0], other[0]), min(box[1], other[1]),
+                        max(box[2], other[2]), max(box[3], other[3])
+                    )
+                    changed = True
+                    break
+            else:
+                result.append(box)
+        merged = result
+
+    return merged
+
+
+def find_ink_regions(image, halo=8, tile_size=32, threshold=100):
+    """
+    自动检测墨迹区域（文字、标题、落款、印章）
+
+    先按 tile_size 分块统计哪些块含有墨迹，再把相连的块合并为包围盒，
+    最后向外扩展 halo 像素并合并重叠部分
+
+    Args:
+        image: 输入图像
+        halo: 包围盒扩展像素（应不小于渗透距离 + 模糊半径）
+        tile_size: 分块大小
+        threshold: 墨迹灰度阈值
+
+    Returns:
+        list: [(x0, y0, x1, y1), ...]
+    """
+    width, height = image.size
+    ink_mask = get_ink_mask(image, threshold)
+
+    # 分块统计
+    rows = -(-height // tile_size)
+    cols = -(-width // tile_size)
+    padded = np.zeros((rows * tile_size, cols * tile_size), dtype=bool)
+    padded[:height, :width] = ink_mask
+    occupied = padded.reshape(rows, tile_size, cols, tile_size).any(axis=(1, 3))
+
+    # 相连的墨迹块合并为一个区域（分块网格很小，直接广度优先搜索）
+    regions = []
+    visited = np.zeros_like(occupied)
+    for row, col in zip(*np.nonzero(occupied)):
+        if visited[row, col]:
+            continue
+        visited[row, col] = True
+        stack = [(row, col)]
+        min_row, min_col, max_row, max_col = row, col, row, col
+        while stack:
+            r, c = stack.pop()
+            min_row, max_row = min(min_row, r), max(max_row, r)
+            min_col, max_col = min(min_col, c), max(max_col, c)
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < rows and 0 <= nc < cols and occupied[nr, nc] and not visited[nr, nc]:
+                    visited[nr, nc] = True
+                    stack.append((nr, nc))
+
+        # 块内收紧到实际墨迹范围
+        x0, y0 = min_col * tile_size, min_row * tile_size
+        x1, y1 = min(width, (max_col + 1) * tile_size), min(height, (max_row + 1) * tile_size)
+        ys, xs = np.nonzero(ink_mask[y0:y1, x0:x1])
+        regions.append((x0 + xs.min(), y0 + ys.min(), x0 + xs.max() + 1, y0 + ys.max() + 1))
+
+    return merge_regions([expand_region(box, halo, width, height) for box in regions])
+
+
+def apply_ink_effect_in_regions(image, effect, regions, halo, output_mode=None, region_images=None, **kwargs):
+    """
+    只在墨迹区域内运行墨迹效果，其余纸张保持不变
+
+    Args:
+        image: 输入图像
+        effect: 墨迹效果函数 effect(image, **kwargs)
+        regions: "auto" 自动检测，或包围盒列表（如字形、标题、落款、印章的 textbbox）
+        halo: 区域扩展像素（渗透距离 + 模糊半径）
+        output_mode: 输出图像模式（默认与输入一致）
+        region_images: 与输入图像同尺寸的辅助图像 {参数名: 图像}（如纸张纹理），
+                       按每个区域裁剪后作为同名参数传给效果函数
+        **kwargs: 传给效果函数的参数
+
+    Returns:
+        Image: 处理后的图像
+    """
+    width, height = image.size
+
+    if regions == "auto":
+        boxes = find_ink_regions(image, halo)
+    else:
+        boxes = merge_regions([expand_region(box, halo, width, height) for box in regions])
+
+    result = image.convert(output_mode or image.mode)
+
+    for index, box in enumerate(boxes):
+        region_kwargs = dict(kwargs)
+        if kwargs.get('seed') is not None:
+            # 每个区域使用独立但确定的随机种子
+            region_kwargs['seed'] = int(np.random.SeedSequence([kwargs['seed'], index]).generate_state(1)[0])
+        for name, region_image in (region_images or {}).items():
+            region_kwargs[name] = region_image.crop(box)
+        region_result = effect(image.crop(box), **region_kwargs)
+        result.paste(region_result.convert(result.mode), box[:2])
+
+    print(f"  墨迹区域: {len(boxes)} 个, 覆盖 {sum((b[2] - b[0]) * (b[3] - b[1]) for b in boxes) / (width * height):.1%} 画布")
+
+    return result
@@ -0,0 +1,179 @@
+from PIL import Image, ImageDraw
+from collections import OrderedDict
+import hashlib
+import os
+import numpy as np
+
+from .ink_bleed_engine import get_ink_mask, get_scatter_bleed_params, generate_scatter_bleed_alpha, composite_bleed_alpha
+
+# 字形渗透精灵缓存（内存LRU + 可选磁盘缓存）
+_SPRITE_CACHE = OrderedDict()
+_SPRITE_CACHE_SETTINGS = {
+    'max_items': 512,    # 内存中最多保留的精灵数量
+    'cache_dir': None,   # 磁盘缓存目录，None 表示不使用磁盘
+}
+_SPRITE_CACHE_STATS = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+
+def configure_bleed_sprite_cache(max_items=512, cache_dir=None):
+    """
+    配置字形渗透精灵缓存
+
+    Args:
+        max_items: 内存LRU容量
+        cache_dir: 磁盘缓存目录（可选），批量任务之间可复用
+    """
+    _SPRITE_CACHE_SETTINGS['max_items'] = max(1, int(max_items))
+    _SPRITE_CACHE_SETTINGS['cache_dir'] = cache_dir
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    while len(_SPRITE_CACHE) > _SPRITE_CACHE_SETTINGS['max_items']:
+        _SPRITE_CACHE.popitem(last=False)
+
+
+def clear_bleed_sprite_cache():
+    """清空内存缓存和统计（磁盘缓存保留）"""
+    _SPRITE_CACHE.clear()
+    for key in _SPRITE_CACHE_STATS:
+        _SPRITE_CACHE_STATS[key] = 0
+
+
+def get_bleed_sprite_cache_info():
+    """获取缓存统计信息"""
+    return dict(_SPRITE_CACHE_STATS, size=len(_SPRITE_CACHE), max_items=_SPRITE_CACHE_SETTINGS['max_items'])
+
+
+def _has_font_path(font):
+    """字体是否来自字体文件（只有这样的字体在多次运行之间有稳定的缓存键）"""
+    return isinstance(getattr(font, 'path', None), str)
+
+
+def _get_font_key(font):
+    """字体的缓存键：字体文件 + 字号（无文件的默认字体按对象区分，只用于内存缓存）"""
+    if _has_font_path(font):
+        return (os.path.abspath(font.path), getattr(font, 'index', 0), getattr(font, 'size', None))
+    return ('font-object', id(font), getattr(font, 'size', None))
+
+
+def render_bleed_sprite(text, font, fill=(0, 0, 0), intensity=0.3, seed=0):
+    """
+    渲染单个字形（或短文本）的渗透精灵
+
+    精灵为透明RGBA图像：字形本身 + 其上叠加的墨迹渗透层，
+    与先绘制文字再调用 add_ink_bleed_effect 的局部结果一致
+
+    Args:
+        text: 字符（或短文本）
+        font: 字体
+        fill: 文字颜色
+        intensity: 渗透强度
+        seed: 随机种子（相同种子得到相同的渗透形态）
+
+    Returns:
+        tuple: (精灵图像, 精灵相对于 draw.text 位置的偏移 (dx, dy))
+    """
+    params = get_scatter_bleed_params(intensity)
+    pad = params['halo']
+
+    bbox = font.getbbox(text)
+    size = (bbox[2] - bbox[0] + 2 * pad, bbox[3] - bbox[1] + 2 * pad)
+    origin = (pad - bbox[0], pad - bbox[1])
+    fill = tuple(fill[:3])
+
+    # 在白底上绘制以获得与整幅处理一致的文字掩码
+    probe = Image.new('RGB', size, (255, 255, 255))
+    ImageDraw.Draw(probe).text(origin, text, font=font, fill=fill)
+    text_mask = get_ink_mask(probe)
+
+    # 透明底上的字形
+    glyph = Image.new('RGBA', size, fill + (0,))
+    ImageDraw.Draw(glyph).text(origin, text, font=font, fill=fill + (255,))
+
+    rng = np.random.default_rng(seed)
+    bleed_alpha = generate_scatter_bleed_alpha(text_mask, params['bleed_range'], params['bleed_count'],
+                                               params['min_alpha'], params['max_alpha'], rng, step=2)
+    sprite = composite_bleed_alpha(glyph, bleed_alpha, params['blur_radius'])
+
+    return sprite, (bbox[0] - pad, bbox[1] - pad)
+
+
+def get_bleed_sprite(text, font, fill=(0, 0, 0), intensity=0.3, seed=0):
+    """
+    获取字形渗透精灵（带缓存），缓存键为 (字符, 字体, 字号, 颜色, 强度, 种子)
+
+    没有字体文件路径的字体（如 load_default）只使用内存缓存：对象 id 在不同运行之间
+    可能被新字体复用，写入磁盘会读到错误的精灵
+
+    Returns:
+        tuple: (精灵图像, 偏移 (dx, dy))
+    """
+    key = (text, _get_font_key(font), tuple(fill[:3]), round(float(intensity), 4), seed)
+
+    if key in _SPRITE_CACHE:
+        _SPRITE_CACHE.move_to_end(key)
+        _SPRITE_CACHE_STATS['hits'] += 1
+        return _SPRITE_CACHE[key]
+
+    sprite = None
+    cache_dir = _SPRITE_CACHE_SETTINGS['cache_dir'] if _has_font_path(font) else None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + ".png")
+        if os.path.exists(cache_path):
+            pad = get_scatter_bleed_params(intensity)['halo']
+            bbox = font.getbbox(text)
+            with Image.open(cache_path) as cached:
+                sprite = (cached.convert('RGBA'), (bbox[0] - pad, bbox[1] - pad))
+            _SPRITE_CACHE_STATS['disk_hits'] += 1
+
+    if sprite is None:
+        sprite = render_bleed_sprite(text, font, fill, intensity, seed)
+        _SPRITE_CACHE_STATS['misses'] += 1
+        if cache_dir:
+            sprite[0].save(cache_path)
+
+    _SPRITE_CACHE[key] = sprite
+    while len(_SPRITE_CACHE) > _SPRITE_CACHE_SETTINGS['max_items']:
+        _SPRITE_CACHE.popitem(last=False)
+
+    return sprite
+
+
+def draw_text_with_bleed(image, position, text, font, fill=(0, 0, 0), intensity=0.3, seed=0):
+    """
+    在图像上绘制带墨迹渗透的文字（原地修改），用法同 draw.text
+
+    同一字形、字体、颜色、强度和种子的渗透只计算一次，之后直接合成缓存的精灵
+
+    Args:
+        image: 目标图像（RGBA 使用 alpha 合成，其他模式使用带蒙版粘贴）
+        position: 文字位置（与 draw.text 相同）
+        text: 字符（或短文本）
+        font: 字体
+        fill: 文字颜色
+        intensity: 渗透强度
+        seed: 随机种子，可用 seed 控制同一字的不同形态
+
+    Returns:
+        Image: 修改后的图像
+    """
+    sprite, (offset_x, offset_y) = get_bleed_sprite(text, font, fill, intensity, seed)
+
+    x = int(round(position[0])) + offset_x
+    y = int(round(position[1])) + offset_y
+
+    # 裁掉超出画布的部分
+    left, top = max(0, -x), max(0, -y)
+    right = min(sprite.width, image.width - x)
+    bottom = min(sprite.height, image.height - y)
+    if right <= left or bottom <= top:
+        return image
+    if (left, top, right, bottom) != (0, 0, sprite.width, sprite.height):
+        sprite = sprite.crop((left, top, right, bottom))
+
+    if image.mode == 'RGBA':
+        image.alpha_composite(sprite, (x + left, y + top))
+    else:
+        image.paste(sprite, (x + left, y + top), sprite)
+
+    return image
@@ -0,0 +1,194 @@
+import math
+import numpy as np
+
+from .ink_bleed_engine import get_ink_mask, composite_bleed_alpha
+from .ink_bleed_regions import apply_ink_effect_in_regions
+from .render_quality import scale_iterations
+
+# 各纸张的扩散参数
+INK_DIFFUSION_PRESETS = {
+    "xuan": {
+        "description": "宣纸 - 吸水性强，沿纤维明显扩散",
+        "conductivity": 0.9,       # 基础传导率
+        "fiber_anisotropy": 3.0,   # 沿纤维方向与垂直方向的传导率之比
+        "fiber_gain": 1.0,         # 纤维处传导率的增益
+        "steps": 30,               # 扩散步数（每步最多扩散1像素）
+        "max_alpha": 110,          # 渗透层最大Alpha
+    },
+    "rice": {
+        "description": "米纸 - 表面光滑，轻微扩散，边缘清晰",
+        "conductivity": 0.5,
+        "fiber_anisotropy": 1.5,
+        "fiber_gain": 0.5,
+        "steps": 10,
+        "max_alpha": 60,
+    },
+    "parchment": {
+        "description": "羊皮纸 - 几乎不吸水，吸收不均匀",
+        "conductivity": 0.35,
+        "fiber_anisotropy": 1.2,
+        "fiber_gain": 2.0,
+        "steps": 8,
+        "max_alpha": 80,
+    },
+}
+
+# 8邻域方向 (dy, dx)，对角方向距离为 sqrt(2)
+_NEIGHBOUR_OFFSETS = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+
+
+def box_blur_array(array, radius):
+    """二维浮点数组的盒式模糊（积分图实现，边缘复制）"""
+    if radius <= 0:
+        return array
+    size = 2 * radius + 1
+    padded = np.pad(array, radius, mode='edge').astype(np.float64)
+    integral = np.pad(padded.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    total = (integral[size:, size:] - integral[:-size, size:]
+             - integral[size:, :-size] + integral[:-size, :-size])
+    return (total / (size * size)).astype(np.float32)
+
+
+def estimate_fiber_field(paper_gray, smoothing=3):
+    """
+    用结构张量估计纸张纤维的方向场
+
+    纤维是细长的暗线，灰度梯度垂直于纤维，因此纤维方向为主梯度方向旋转90度
+
+    Args:
+        paper_gray: 纸张灰度（float 数组）
+        smoothing: 结构张量平滑半径
+
+    Returns:
+        tuple: (纤维方向 x 分量, y 分量, 方向一致性 0-1)
+    """
+    gy, gx = np.gradient(paper_gray.astype(np.float32))
+
+    jxx = box_blur_array(gx * gx, smoothing)
+    jyy = box_blur_array(gy * gy, smoothing)
+    jxy = box_blur_array(gx * gy, smoothing)
+
+    gradient_angle = 0.5 * np.arctan2(2 * jxy, jxx - jyy)
+    fiber_angle = gradient_angle + math.pi / 2
+
+    eigen_gap = np.sqrt((jxx - jyy) ** 2 + 4 * jxy ** 2)
+    coherence = eigen_gap / np.maximum(jxx + jyy, 1e-6)
+
+    return np.cos(fiber_angle), np.sin(fiber_angle), np.clip(coherence, 0, 1)
+
+
+def build_conductivity_weights(paper_gray, conductivity, fiber_anisotropy, fiber_gain):
+    """
+    由纸张纹理构建8个方向的传导率
+
+    纤维（比周围暗的细线）传导更快，且沿纤维方向比垂直方向快 fiber_anisotropy 倍
+
+    Returns:
+        list: [(dy, dx, 界面传导率数组), ...]
+    """
+    height, width = paper_gray.shape
+    tx, ty, coherence = estimate_fiber_field(paper_gray)
+
+    # 纤维强度：比局部平均更暗的程度
+    local_mean = box_blur_array(paper_gray, 4)
+    fiber_strength = np.clip((local_mean - paper_gray) / 12.0, 0, 1)
+    pixel_conductivity = conductivity * (1 + fiber_gain * fiber_strength)
+
+    weights = []
+    padded = np.pad(pixel_conductivity, 1, mode='edge')
+    for dy, dx in _NEIGHBOUR_OFFSETS:
+        length = math.hypot(dx, dy)
+        alignment = ((tx * dx + ty * dy) / length) ** 2
+        direction_gain = 1 + (fiber_anisotropy - 1) * coherence * alignment
+        neighbour = padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+        face = 0.5 * (pixel_conductivity + neighbour) * direction_gain / (length * length)
+        weights.append((dy, dx, face.astype(np.float32)))
+
+    return weights
+
+
+def diffuse_ink(ink_mask, weights, steps, tolerance=1e-3):
+    """
+    显式迭代求解墨水浓度扩散（墨迹像素为恒定浓度1的源）
+
+    每一步都是整体数组的8邻域模板更新，运行时间只取决于步数和图像大小；
+    浓度变化小于 tolerance 时提前停止
+
+    Returns:
+        tuple: (浓度场, 实际步数)
+    """
+    height, width = ink_mask.shape
+    concentration = ink_mask.astype(np.float32)
+
+    # 稳定性条件：dt × 各方向传导率之和 <= 1
+    total_weight = sum(face for _, _, face in weights)
+    dt = 0.9 / max(float(total_weight.max()), 1e-6)
+
+    steps_run = 0
+    for steps_run in range(1, steps + 1):
+        padded = np.pad(concentration, 1, mode='edge')
+        change = np.zeros_like(concentration)
+        for dy, dx, face in weights:
+            neighbour = padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+            change += face * (neighbour - concentration)
+        change *= dt
+        change[ink_mask] = 0
+
+        concentration += change
+        if float(np.abs(change).max()) < tolerance:
+            break
+
+    return concentration, steps_run
+
+
+def add_ink_diffusion_effect(image, paper_type="xuan", steps=None, tolerance=1e-3,
+                             paper_texture=None, image_mode="RGBA", regions=None):
+    """
+    各向异性墨水扩散效果（基于纸张纤维场的物理迭代求解）
+
+    Args:
+        image: 输入图像（纸张 + 文字）
+        paper_type: 纸张类型 "xuan" / "rice" / "parchment"
+        steps: 扩散步数（默认取预设值，随渲染质量档位缩放），运行时间与步数成正比
+        tolerance: 提前停止的浓度变化阈值
+        paper_texture: 不含文字的纸张纹理（可选），默认从输入图像中估计
+        image_mode: 输出图像模式
+        regions: 墨迹区域 - None 处理整幅画布，"auto" 自动检测，或包围盒列表
+
+    Returns:
+        Image: 处理后的图像
+    """
+    preset = INK_DIFFUSION_PRESETS.get(paper_type, INK_DIFFUSION_PRESETS["xuan"])
+    if steps is None:
+        steps = scale_iterations(preset["steps"])
+
+    if regions is not None:
+        # 显式格式每步最多扩散1像素，边距 = 步数 + 1；纸张纹理按区域裁剪后一并传入
+        region_images = None
+        if paper_texture is not None:
+            region_images = {'paper_texture': paper_texture.resize(image.size)}
+        return apply_ink_effect_in_regions(image, add_ink_diffusion_effect, regions, steps + 1,
+                                           "RGB" if image_mode == "RGB" else "RGBA", region_images,
+                                           paper_type=paper_type, steps=steps, tolerance=tolerance,
+                                           image_mode=image_mode)
+
+    ink_mask = get_ink_mask(image)
+
+    # 纸张灰度：墨迹像素用纸张中值填充，避免文字边缘被当作纤维
+    if paper_texture is not None:
+        paper_gray = np.array(paper_texture.convert('L').resize(image.size), dtype=np.float32)
+    else:
+        paper_gray = np.array(image.convert('L'), dtype=np.float32)
+        if ink_mask.any() and not ink_mask.all():
+            paper_gray[ink_mask] = np.median(paper_gray[~ink_mask])
+
+    weights = build_conductivity_weights(paper_gray, preset["conductivity"],
+                                         preset["fiber_anisotropy"], preset["fiber_gain"])
+    concentration, steps_run = diffuse_ink(ink_mask, weights, steps, tolerance)
+
+    print(f"[扩散求解] 纸张:{paper_type}, 步数:{steps_run}/{steps}")
+
+    bleed_alpha = np.clip(concentration * preset["max_alpha"], 0, 255).astype(np.uint8)
+    bleed_alpha[ink_mask] = 0
+
+    return composite_bleed_alpha(image, bleed_alpha, 0, image_mode)
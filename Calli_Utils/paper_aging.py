@@ -0,0 +1,164 @@
+from PIL import Image
+import numpy as np
+
+
+def get_radial_fade_kernel(radius, strength):
+    """
+    径向衰减核：距中心 d < radius 处为 1 - (d / radius) × strength，其余为1
+
+    覆盖范围与原逐像素循环一致：偏移 -radius ~ radius-1
+
+    Returns:
+        tuple: (dy数组, dx数组, 衰减值数组)，只包含圆内的偏移
+    """
+    dy, dx = np.mgrid[-radius:radius, -radius:radius]
+    distance = np.sqrt(dx * dx + dy * dy)
+    inside = distance < radius
+    return dy[inside], dx[inside], (1.0 - distance[inside] / radius * strength).astype(np.float32)
+
+
+def new_fade_map(shape):
+    """
+    新建衰减图：只记录被盖到的像素（扁平索引）及其各通道的对数系数，
+    计算量与斑点覆盖的面积成正比，与画布大小无关
+
+    Args:
+        shape: (height, width)
+
+    Returns:
+        dict: 衰减图
+    """
+    return {"shape": tuple(shape), "index": [], "log": []}
+
+
+def _stamp_log_values(fade_map, ys, xs, log_values):
+    """记录每个点的各通道对数系数（画布外的点被丢弃）"""
+    height, width = fade_map["shape"]
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    fade_map["index"].append(ys[inside] * width + xs[inside])
+    fade_map["log"].append(np.asarray(log_values, dtype=np.float32)[inside])
+
+
+def stamp_radial_fades(fade_map, xs, ys, radii, strength, channel_factors=(1.0, 1.0, 1.0)):
+    """
+    一次性盖上所有径向衰减斑（按半径分组，每组共用一个衰减核）
+
+    每次命中像素乘以 衰减值 × 通道系数（以对数记录，相乘即相加），结果记入 fade_map
+
+    Args:
+        fade_map: 衰减图，见 new_fade_map
+        xs, ys, radii: 斑点中心与半径数组
+        strength: 中心处的衰减量
+        channel_factors: 每次命中时各通道额外乘的系数（如变黄 (1, 0.98, 0.95)）
+    """
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    radii = np.asarray(radii, dtype=np.int64)
+    log_factors = np.log(np.asarray(channel_factors, dtype=np.float32))
+
+    for radius in np.unique(radii):
+        selected = radii == radius
+        dy, dx, fade = get_radial_fade_kernel(int(radius), strength)
+        kernel = np.log(fade)[:, None] + log_factors[None, :]
+
+        py = (ys[selected][:, None] + dy[None, :]).ravel()
+        px = (xs[selected][:, None] + dx[None, :]).ravel()
+        _stamp_log_values(fade_map, py, px, np.tile(kernel, (int(selected.sum()), 1)))
+
+
+def stamp_color_spots(fade_map, xs, ys, sizes, probability, channel_factors, rng):
+    """
+    方形色斑：范围 (偏移 -size ~ size-1) 内每个像素以 probability 的概率乘以通道系数，
+    结果记入 fade_map
+    """
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    sizes = np.asarray(sizes, dtype=np.int64)
+    log_factors = np.log(np.asarray(channel_factors, dtype=np.float32))
+
+    for size in np.unique(sizes):
+        selected = sizes == size
+        dy, dx = np.mgrid[-size:size, -size:size]
+        py = (ys[selected][:, None] + dy.ravel()[None, :]).ravel()
+        px = (xs[selected][:, None] + dx.ravel()[None, :]).ravel()
+        chosen = rng.random(len(px)) < probability
+        _stamp_log_values(fade_map, py[chosen], px[chosen],
+                          np.broadcast_to(log_factors, (int(chosen.sum()), 3)))
+
+
+def apply_fade_map_to_array(pixels, fade_map):
+    """
+    把衰减图一次性作用到像素数组的 RGB 通道上（原地修改，只处理被盖到的像素）
+
+    同一像素的多次命中相乘（对数相加），其余通道（Alpha）不变
+
+    Args:
+        pixels: uint8 数组 (height, width, 3 或 4)
+        fade_map: 衰减图，见 new_fade_map
+    """
+    if not fade_map["index"]:
+        return
+
+    touched, inverse = np.unique(np.concatenate(fade_map["index"]), return_inverse=True)
+    log_values = np.concatenate(fade_map["log"])
+    total = np.stack([np.bincount(inverse, weights=log_values[:, c], minlength=len(touched))
+                      for c in range(3)], axis=1).astype(np.float32)
+
+    flat_pixels = pixels.reshape(-1, pixels.shape[2])
+    rgb = flat_pixels[touched, :3].astype(np.float32) * np.exp(total)
+    flat_pixels[touched, :3] = np.clip(rgb, 0, 255).astype(np.uint8)
+
+
+def apply_fade_map(image, fade_map):
+    """
+    把衰减图一次性作用到图像的 RGB 上，返回新图像（RGB 或 RGBA，Alpha 保持不变）
+
+    Returns:
+        Image: 处理后的图像
+    """
+    pixels = np.array(image)
+    apply_fade_map_to_array(pixels, fade_map)
+    return Image.fromarray(pixels, image.mode)
+
+
+def add_yellowing_stains(fade_map, count, radius_range=(2, 8), rng=None):
+    """细微的变黄色斑：中心略暗，整体偏黄"""
+    if rng is None:
+        rng = np.random.default_rng()
+    height, width = fade_map["shape"]
+    stamp_radial_fades(
+        fade_map,
+        rng.integers(0, width, count),
+        rng.integers(0, height, count),
+        rng.integers(radius_range[0], radius_range[1] + 1, count),
+        0.1, (1.0, 0.98, 0.95)
+    )
+
+
+def add_water_stains(fade_map, count, radius_range=(10, 50), strength=0.3, rng=None):
+    """水渍：中心颜色更深，向外渐淡"""
+    if rng is None:
+        rng = np.random.default_rng()
+    height, width = fade_map["shape"]
+    stamp_radial_fades(
+        fade_map,
+        rng.integers(0, width + 1, count),
+        rng.integers(0, height + 1, count),
+        rng.integers(radius_range[0], radius_range[1] + 1, count),
+        strength
+    )
+
+
+def add_color_spots(fade_map, count, size_range=(2, 8), probability=0.7,
+                    channel_factors=(1.1, 0.9, 0.8), rng=None):
+    """黄色或棕色斑点"""
+    if rng is None:
+        rng = np.random.default_rng()
+    height, width = fade_map["shape"]
+    stamp_color_spots(
+        fade_map,
+        rng.integers(0, width, count),
+        rng.integers(0, height, count),
+        rng.integers(size_range[0], size_range[1] + 1, count),
+        probability, channel_factors, rng
+    )
@@ -1,131 +1,295 @@
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
-import random
 import math
 import re
+from collections import OrderedDict
 import numpy as np
 
-def generate_natural_torn_edge(width, height, roughness=0.5):
-    """生成自然的撕边效果 - 结合平滑和粗糙元素"""
+from .render_quality import get_sampling_scale
+
+# 撕边轮廓缓存（LRU）：键为 (粗糙度, 种子, 宽高比, 纤维强度, 轮廓参数)，值为归一化的矢量轮廓与纤维
+_TORN_OUTLINE_CACHE = OrderedDict()
+_TORN_OUTLINE_CACHE_SETTINGS = {
+    'max_items': 64,   # 最多保留的轮廓数量
+}
+TORN_OUTLINE_REFERENCE = 1000  # 生成轮廓时的参考长边（像素），噪声幅度与纤维长度按此尺寸定义
+
+
+def fractal_noise_1d(count, rng, octaves=5, base_cells=8, persistence=0.5):
+    """
+    周期性一维分形噪声（多倍频程值噪声）：首尾相接，适合闭合轮廓
+
+    每一层在 base_cells × 2^k 个格点上取随机值，平滑插值后按 persistence^k 叠加
+
+    Args:
+        count: 采样点数（均匀分布在一个周期内）
+        rng: numpy 随机数生成器
+        octaves: 倍频程数
+        base_cells: 第一层的格点数（决定最大起伏的波长）
+        persistence: 每一层的振幅衰减
+
+    Returns:
+        numpy.ndarray: 噪声，均值0、标准差1
+    """
+    u = np.arange(count) / count
+    total = np.zeros(count)
+    amplitude = 1.0
+
+    for octave in range(octaves):
+        cells = base_cells * 2 ** octave
+        lattice = rng.standard_normal(cells)
+        position = u * cells
+        left = np.floor(position).astype(np.int64) % cells
+        t = position - np.floor(position)
+        t = t * t * (3 - 2 * t)  # smoothstep 插值
+        total += amplitude * (lattice[left] * (1 - t) + lattice[(left + 1) % cells] * t)
+        amplitude *= persistence
+
+    total -= total.mean()
+    std = total.std()
+    return total / std if std > 0 else total
+
+
+def _rounded_rectangle_path(x0, y0, x1, y1, radius, count):
+    """
+    沿圆角矩形（顺时针，从上边开始）按弧长均匀取点
+
+    Returns:
+        tuple: (点坐标 (count, 2), 向外的法线 (count, 2), 周长)
+    """
+    radius = max(0.0, min(radius, (x1 - x0) / 2, (y1 - y0) / 2))
+    straight_x = x1 - x0 - 2 * radius
+    straight_y = y1 - y0 - 2 * radius
+    arc = math.pi * radius / 2
+
+    # 8段：上、右上角、右、右下角、下、左下角、左、左上角
+    lengths = np.array([straight_x, arc, straight_y, arc, straight_x, arc, straight_y, arc])
+    starts = np.array([[x0 + radius, y0], [x1 - radius, y0 + radius], [x1, y0 + radius], [x1 - radius, y1 - radius],
+                       [x1 - radius, y1], [x0 + radius, y1 - radius], [x0, y1 - radius], [x0 + radius, y0 + radius]])
+    directions = np.array([[1, 0], [0, 0], [0, 1], [0, 0], [-1, 0], [0, 0], [0, -1], [0, 0]], dtype=np.float64)
+    normals = np.array([[0, -1], [0, 0], [1, 0], [0, 0], [0, 1], [0, 0], [-1, 0], [0, 0]], dtype=np.float64)
+    arc_start_angles = np.array([0, -math.pi / 2, 0, 0, 0, math.pi / 2, 0, math.pi])
+
+    perimeter = lengths.sum()
+    arc_length = np.arange(count) * perimeter / count
+    piece = np.clip(np.searchsorted(np.cumsum(lengths), arc_length, side='right'), 0, 7)
+    local = arc_length - (np.cumsum(lengths) - lengths)[piece]
+
+    # 直边：起点 + 局部弧长 × 方向；圆角：圆心 + 半径 × (cos, sin)，法线为径向
+    points = starts[piece] + local[:, None] * directions[piece]
+    point_normals = normals[piece].copy()
+    on_arc = piece % 2 == 1
+    if radius > 0 and on_arc.any():
+        angles = arc_start_angles[piece[on_arc]] + local[on_arc] / radius
+        radial = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        points[on_arc] = starts[piece[on_arc]] + radius * radial
+        point_normals[on_arc] = radial
+
+    return points, point_normals, perimeter
+
+
+def generate_fractal_torn_edge(width, height, roughness=0.5, rng=None, spacing=3.0, octaves=5,
+                               corner_radius=0.0, tear_rate=0.5, tear_depth=None):
+    """
+    分形撕边轮廓：四条边的所有顶点一次性计算
+
+    轮廓为向内收缩 3% 的圆角矩形，沿法线方向叠加周期性多倍频程噪声（无明显周期、首尾相接），
+    并随机加入少量较深的撕口
+
+    Args:
+        width, height: 纸张尺寸
+        roughness: 粗糙度（噪声起伏的标准差约为 roughness × 5 像素）
+        rng: numpy 随机数生成器
+        spacing: 顶点间距（像素）
+        octaves: 噪声倍频程数
+        corner_radius: 圆角半径（像素）
+        tear_rate: 每1000像素周长上平均的深撕口数
+        tear_depth: 深撕口的最大深度（像素），默认 roughness × 40
+
+    Returns:
+        numpy.ndarray: 轮廓顶点 (N, 2)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if tear_depth is None:
+        tear_depth = roughness * 40
+
     margin = min(width, height) * 0.03
+    perimeter = 2 * (width + height - 4 * margin)
+    count = max(16, int(perimeter / spacing))
+    points, normals, perimeter = _rounded_rectangle_path(margin, margin, width - margin, height - margin,
+                                                         corner_radius, count)
+
+    # 最大起伏的波长约 200 像素
+    base_cells = max(4, int(round(perimeter / 200)))
+    offset = roughness * 5 * fractal_noise_1d(count, rng, octaves, base_cells)
+
+    # 深撕口：向内的尖形凹陷，宽 15-40 像素
+    arc_length = np.arange(count) * perimeter / count
+    for _ in range(rng.poisson(tear_rate * perimeter / 1000)):
+        center = rng.uniform(0, perimeter)
+        half_width = rng.uniform(7.5, 20)
+        depth = rng.uniform(0.4, 1.0) * tear_depth
+        distance = np.abs((arc_length - center + perimeter / 2) % perimeter - perimeter / 2)
+        offset -= depth * np.clip(1 - distance / half_width, 0, None) ** 1.5
+
+    points = points + offset[:, None] * normals
+    points[:, 0] = np.clip(points[:, 0], 0, width - 1)
+    points[:, 1] = np.clip(points[:, 1], 0, height - 1)
+    return points
+
+def _draw_edge_fibers(mask_array, x_starts, y_starts, angles, lengths, alpha_step=40):
+    """
+    批量绘制边缘纤维（原地修改蒙版）：每根纤维从起点沿方向走 length 步，
+    第 i 步的 Alpha 为 255 - i × alpha_step，与原值取较小者
+
+    Args:
+        mask_array: uint8 蒙版数组
+        x_starts, y_starts: 纤维起点（像素）
+        angles: 纤维方向（弧度）
+        lengths: 纤维长度（步数）
+        alpha_step: 每一步 Alpha 的减少量
+    """
+    height, width = mask_array.shape
+    lengths = np.asarray(lengths, dtype=np.int64)
+    fiber_index = np.repeat(np.arange(len(lengths)), lengths)
+    step = np.arange(len(fiber_index)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    # astype 向零截断，与 int() 一致
+    angles = np.asarray(angles)[fiber_index]
+    fiber_x = (np.asarray(x_starts)[fiber_index] + step * np.cos(angles)).astype(np.int64)
+    fiber_y = (np.asarray(y_starts)[fiber_index] + step * np.sin(angles)).astype(np.int64)
+    alpha = np.clip(255 - step * alpha_step, 0, 255).astype(np.uint8)
+
+    inside = (fiber_x >= 0) & (fiber_x < width) & (fiber_y >= 0) & (fiber_y < height)
+    np.minimum.at(mask_array, (fiber_y[inside], fiber_x[inside]), alpha[inside])
+
+def get_torn_outline(roughness=0.5, seed=None, aspect=1.0, fiber_intensity=0.2, **edge_params):
+    """
+    获取归一化的撕边矢量轮廓（带缓存）
     
-    points = []
-    
-    # 生成四边的控制点
-    edges = [
-        # 上边
-        [(margin, margin), (width - margin, margin)],
-        # 右边  
-        [(width - margin, margin), (width - margin, height - margin)],
-        # 下边
-        [(width - margin, height - margin), (margin, height - margin)],
-        # 左边
-        [(margin, height - margin), (margin, margin)]
-    ]
-    
-    for edge_start, edge_end in edges:
-        edge_length = math.sqrt((edge_end[0]-edge_start[0])**2 + (edge_end[1]-edge_start[1])**2)
-        segments = max(20, int(edge_length / 15))  # 动态分段
-        
-        for i in range(segments + 1):
-            # 线性插值
-            t = i / segments
-            base_x = edge_start[0] + t * (edge_end[0] - edge_start[0])
-            base_y = edge_start[1] + t * (edge_end[1] - edge_start[1])
-            
-            # 多频率噪声组合
-            noise = 0
-            
-            # 1. 低频大波浪（整体形状）
-            freq1 = 0.02
-            amp1 = roughness * 8
-            noise += math.sin(t * segments * freq1) * amp1
-            
-            # 2. 中频细节（主要撕边感）
-            freq2 = 0.1
-            amp2 = roughness * 4
-            noise += math.sin(t * segments * freq2 + 1) * amp2
-            
-            # 3. 高频细节（纤维感）
-            freq3 = 0.5
-            amp3 = roughness * 2
-            noise += math.sin(t * segments * freq3 + 2) * amp3
-            
-            # 4. 随机扰动（自然感）
-            random_noise = random.uniform(-1, 1) * roughness * 3
-            
-            # 计算垂直方向
-            if edge_start[0] == edge_end[0]:  # 垂直边
-                x = base_x + noise + random_noise
-                y = base_y
-            else:  # 水平边
-                x = base_x
-                y = base_y + noise + random_noise
-            
-            # 确保坐标在图像范围内
-            x = max(0, min(width - 1, x))
-            y = max(0, min(height - 1, y))
-            
-            points.append((x, y))
+    轮廓在参考尺寸（长边 TORN_OUTLINE_REFERENCE）上生成一次，坐标除以参考尺寸归一化到 0~1；
+    边缘纤维沿轮廓按弧长均匀分布，长度以参考像素计，栅格化时随尺寸缩放。
+    指定 seed 时按 (粗糙度, 种子, 宽高比, 纤维强度, 轮廓参数) 缓存，同一张纸的多种尺寸只生成一次噪声
     
-    return points
+    Args:
+        roughness: 撕边粗糙度
+        seed: 随机种子（None 则每次生成新的轮廓，不缓存）
+        aspect: 宽高比
+        fiber_intensity: 每参考像素周长的纤维数
+        **edge_params: 传给 generate_fractal_torn_edge 的其他参数（圆角、深撕口等，以参考像素计）
+    
+    Returns:
+        dict: points 归一化轮廓顶点 (N, 2)，fiber_starts 归一化纤维起点 (M, 2)，
+              fiber_angles 纤维方向，fiber_lengths 纤维长度（参考像素），reference 参考尺寸
+    """
+    key = (round(float(roughness), 4), seed, round(float(aspect), 3), round(float(fiber_intensity), 4),
+           tuple(sorted(edge_params.items())))
+    if seed is not None and key in _TORN_OUTLINE_CACHE:
+        _TORN_OUTLINE_CACHE.move_to_end(key)
+        return _TORN_OUTLINE_CACHE[key]
+    
+    if aspect >= 1:
+        reference = (TORN_OUTLINE_REFERENCE, max(1, int(round(TORN_OUTLINE_REFERENCE / aspect))))
+    else:
+        reference = (max(1, int(round(TORN_OUTLINE_REFERENCE * aspect))), TORN_OUTLINE_REFERENCE)
+    
+    rng = np.random.default_rng(seed)
+    points = generate_fractal_torn_edge(reference[0], reference[1], roughness, rng, **edge_params)
+    
+    # 纤维起点：沿闭合轮廓按弧长均匀分布
+    closed = np.vstack([points, points[:1]])
+    segment_lengths = np.hypot(*np.diff(closed, axis=0).T)
+    arc = np.concatenate([[0.0], np.cumsum(segment_lengths)])
+    count = int(arc[-1] * fiber_intensity)
+    positions = rng.uniform(0, arc[-1], count)
+    segment = np.clip(np.searchsorted(arc, positions, side='right') - 1, 0, len(segment_lengths) - 1)
+    fraction = (positions - arc[segment]) / np.maximum(segment_lengths[segment], 1e-9)
+    starts = closed[segment] + fraction[:, None] * (closed[segment + 1] - closed[segment])
+    
+    outline = {
+        'points': points / reference,
+        'fiber_starts': starts / reference,
+        'fiber_angles': rng.uniform(0, 2 * math.pi, count),
+        'fiber_lengths': rng.integers(1, 7, count),
+        'reference': reference,
+    }
+    if seed is not None:
+        _TORN_OUTLINE_CACHE[key] = outline
+        while len(_TORN_OUTLINE_CACHE) > _TORN_OUTLINE_CACHE_SETTINGS['max_items']:
+            _TORN_OUTLINE_CACHE.popitem(last=False)
+    return outline
+
+def configure_torn_outline_cache(max_items=64):
+    """
+    配置撕边轮廓缓存
+    
+    Args:
+        max_items: LRU容量（批量生成时超出的最久未用轮廓被丢弃）
+    """
+    _TORN_OUTLINE_CACHE_SETTINGS['max_items'] = max(1, int(max_items))
+    while len(_TORN_OUTLINE_CACHE) > _TORN_OUTLINE_CACHE_SETTINGS['max_items']:
+        _TORN_OUTLINE_CACHE.popitem(last=False)
+
+def clear_torn_outline_cache():
+    """清空撕边轮廓缓存"""
+    _TORN_OUTLINE_CACHE.clear()
 
-def add_micro_fibers_to_mask(mask, fiber_intensity=0.3):
-    """在边缘添加微观纤维效果"""
-    width, height = mask.size
+def rasterize_torn_mask(outline, width, height, supersample=1):
+    """
+    把归一化的撕边轮廓直接栅格化为任意尺寸的蒙版
+    
+    Args:
+        outline: get_torn_outline 的结果
+        width, height: 蒙版尺寸
+        supersample: 超采样倍数（>1 时在放大的画布上绘制轮廓再缩小，边缘抗锯齿）
+    
+    Returns:
+        Image: 'L' 蒙版
+    """
+    supersample = max(1, int(supersample))
+    canvas_size = (width * supersample, height * supersample)
+    mask = Image.new('L', canvas_size, 0)
+    ImageDraw.Draw(mask).polygon([tuple(point) for point in outline['points'] * canvas_size], fill=255)
+    if supersample > 1:
+        mask = mask.resize((width, height), Image.BOX)
     mask_array = np.array(mask)
     
-    # 找到边缘像素
-    edge_pixels = []
-    for i in range(1, height-1):
-        for j in range(1, width-1):
-            if mask_array[i, j] > 128:  # 内部点
-                # 检查是否有外部邻居
-                neighbors = [
-                    mask_array[i-1, j], mask_array[i+1, j],
-                    mask_array[i, j-1], mask_array[i, j+1]
-                ]
-                if any(n < 128 for n in neighbors):
-                    edge_pixels.append((i, j))
-    
-    # 添加纤维
-    for y, x in edge_pixels:
-        if random.random() < fiber_intensity:
-            # 纤维方向（主要向外）
-            angle = random.uniform(0, 2 * math.pi)
-            fiber_length = random.randint(1, 6)
-            
-            for step in range(fiber_length):
-                fiber_y = int(y + step * math.sin(angle))
-                fiber_x = int(x + step * math.cos(angle))
-                
-                # 确保坐标在范围内
-                if 0 <= fiber_x < width and 0 <= fiber_y < height:
-                    # 纤维逐渐变细
-                    alpha = 255 - (step * 40)
-                    if alpha > 0:
-                        current_alpha = mask_array[fiber_y, fiber_x]
-                        mask_array[fiber_y, fiber_x] = min(current_alpha, alpha)
+    # 边缘纤维：长度与 Alpha 递减速度按尺寸缩放（参考尺寸下每像素减少40）
+    pixel_scale = math.sqrt(width * height / (outline['reference'][0] * outline['reference'][1]))
+    lengths = np.maximum(1, np.rint(outline['fiber_lengths'] * pixel_scale))
+    _draw_edge_fibers(mask_array, outline['fiber_starts'][:, 0] * width, outline['fiber_starts'][:, 1] * height,
+                      outline['fiber_angles'], lengths, alpha_step=40 / pixel_scale)
     
     return Image.fromarray(mask_array)
 
-def add_organic_torn_mask(width, height, roughness=0.5):
-    """创建有机的撕边蒙版"""
-    mask = Image.new('L', (width, height), 0)
-    draw = ImageDraw.Draw(mask)
+def add_organic_torn_mask(width, height, roughness=0.5, seed=None, supersample=1, **edge_params):
+    """
+    创建有机的撕边蒙版
     
-    # 生成自然撕边点
-    points = generate_natural_torn_edge(width, height, roughness)
+    撕边轮廓为缓存的矢量路径（见 get_torn_outline），直接按请求的尺寸栅格化，
+    不需要先生成固定尺寸再缩放；草稿/校样质量档位下在缩小的画布上绘制，再放大到原尺寸
     
-    if points:
-        # 绘制撕边形状
-        draw.polygon(points, fill=255)
+    Args:
+        width, height: 蒙版尺寸
+        roughness: 撕边粗糙度
+        seed: 随机种子 - 相同种子和宽高比的纸张在任意尺寸下撕边一致
+        supersample: 超采样抗锯齿倍数
+        **edge_params: 撕边轮廓参数（corner_radius 圆角、tear_rate / tear_depth 深撕口等），
+                       见 generate_fractal_torn_edge
+    """
+    outline = get_torn_outline(roughness, seed, width / height, **edge_params)
     
-    # 添加微观纤维
-    mask = add_micro_fibers_to_mask(mask, fiber_intensity=0.2)
+    scale = get_sampling_scale()
+    mask_width = max(1, int(round(width * scale)))
+    mask_height = max(1, int(round(height * scale)))
+    mask = rasterize_torn_mask(outline, mask_width, mask_height, supersample)
     
     # 轻微模糊使边缘更自然
     mask = mask.filter(ImageFilter.GaussianBlur(radius=0.5))
     
+    if mask.size != (width, height):
+        mask = mask.resize((width, height), Image.BILINEAR)
+    
     return mask
 
 def safe_apply_mask(paper_img, mask):
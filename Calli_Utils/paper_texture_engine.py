@@ -0,0 +1,389 @@
+from PIL import Image
+import copy
+import math
+import numpy as np
+
+from .ink_bleed_engine import stamp_discs
+from .paper_texture_primitives import sample_segment_points, sample_square_points, smooth_noise
+from .render_quality import render_at_sampling_scale
+
+# 纸张规格（声明式）：每种纸由同一组图层组合而成，图层为 None 表示不使用
+#   base_color  底色
+#   grain       逐像素颜色抖动幅度（±grain）
+#   mottling    云状深浅（斑块尺度、平均变暗、起伏、倍频程）
+#   roughness   细微粗糙感（小尺度噪声的变暗幅度）
+#   fibers      纤维（密度=每像素纤维数、长度、方向、变暗、粗细、取点步长；
+#               可选 shape 点的形状 "disc"/"square"、coverage 每个像素的着色概率）
+#   spots       斑点杂质（密度、大小、各通道变暗；可选 shape、coverage，同纤维）
+#   gold_flakes 洒金（密度、金箔大小、每片由几个小圆点组成、颜色及浮动）
+#   shading     纸张起伏的光照（斑块尺度、遮罩均值/标准差、最暗处变暗量；
+#               可选 color 遮罩为0处的颜色，代替底色变暗 depth）
+#   wax_sheen   蜡笺的蜡光（横向拉伸的斑块尺度、提亮强度）
+# 变暗量为 (最小, 最大) 时各通道独立取值，为三个 (最小, 最大) 时逐通道指定范围
+PAPER_SPECS = {
+    "xuan": {
+        "description": "宣纸",
+        "base_color": (242, 232, 212),
+        "grain": 0,
+        "mottling": None,
+        "roughness": None,
+        "fibers": {"density": 1 / 400, "length": (30, 150), "orientation": None,
+                   "darken": (5, 15), "size": (1, 2), "step": 2},
+        "spots": {"density": 1 / 800, "size": (1, 4), "darken": ((10, 25), (10, 25), (10, 25))},
+        "gold_flakes": None,
+        "shading": {"scale": 120, "mean": 85, "std": 45, "depth": 10},
+        "wax_sheen": None,
+    },
+    "rice": {
+        "description": "米纸",
+        "base_color": (248, 240, 225),
+        "grain": 0,
+        "mottling": None,
+        "roughness": None,
+        "fibers": {"density": 1 / 300, "length": (30, 150), "orientation": None,
+                   "darken": (5, 15), "size": (1, 2), "step": 2},
+        "spots": {"density": 1 / 600, "size": (1, 4), "darken": ((10, 25), (10, 25), (10, 25))},
+        "gold_flakes": None,
+        "shading": {"scale": 120, "mean": 85, "std": 45, "depth": 10},
+        "wax_sheen": None,
+    },
+    "parchment": {
+        "description": "羊皮纸",
+        "base_color": (250, 245, 230),
+        "grain": 0,
+        "mottling": None,
+        "roughness": None,
+        "fibers": {"density": 1 / 200, "length": (30, 150), "orientation": None,
+                   "darken": (5, 15), "size": (1, 2), "step": 2},
+        "spots": {"density": 1 / 400, "size": (1, 4), "darken": ((10, 25), (10, 25), (10, 25))},
+        "gold_flakes": None,
+        "shading": {"scale": 120, "mean": 85, "std": 45, "depth": 10},
+        "wax_sheen": None,
+    },
+    "sajin": {
+        "description": "洒金宣",
+        "base_color": (238, 222, 190),
+        "grain": 1,
+        "mottling": {"scale": 80, "strength": 4, "variation": 2, "octaves": 3},
+        "roughness": None,
+        "fibers": {"density": 1 / 500, "length": (30, 150), "orientation": None,
+                   "darken": (5, 12), "size": (1, 2), "step": 2},
+        "spots": {"density": 1 / 2000, "size": (1, 3), "darken": ((10, 25), (10, 25), (10, 25))},
+        "gold_flakes": {"density": 1 / 2500, "size": (1, 3), "cluster": (2, 6),
+                        "color": (214, 176, 84), "variation": 25},
+        "shading": {"scale": 120, "mean": 85, "std": 45, "depth": 8},
+        "wax_sheen": None,
+    },
+    "lajian": {
+        "description": "蜡笺",
+        "base_color": (236, 214, 160),
+        "grain": 1,
+        "mottling": {"scale": 100, "strength": 3, "variation": 2, "octaves": 2},
+        "roughness": None,
+        "fibers": {"density": 1 / 2000, "length": (20, 80), "orientation": (0.0, 0.3),
+                   "darken": (3, 8), "size": (1, 1), "step": 2},
+        "spots": None,
+        "gold_flakes": None,
+        "shading": {"scale": 150, "mean": 120, "std": 40, "depth": 12},
+        "wax_sheen": {"scale": 160, "stretch": 4, "strength": 0.1},
+    },
+    # 以下为原先各自实现的纹理生成器（add_*_texture_enhanced、create_authentic_paper_texture）的规格
+    "xuan_enhanced": {
+        "description": "宣纸",
+        "base_color": (242, 232, 212),
+        "grain": 0,
+        # 云状纹理：平均变暗约9、斑块起伏约3
+        "mottling": {"scale": 60, "strength": 9, "variation": 3, "octaves": 3},
+        "roughness": None,
+        # 原版纤维画在云状纹理之前、随之变暗，变暗量已含云状纹理的平均变暗 9
+        "fibers": {"density": 1 / 200, "length": (50, 200), "orientation": None,
+                   "darken": (17, 24), "size": (1, 3), "step": 3, "shape": "square", "coverage": 0.7},
+        "spots": {"density": 1 / 1000, "size": (2, 6), "darken": ((20, 40), (15, 30), (10, 25)),
+                  "coverage": 0.8},
+        "gold_flakes": None,
+        # 光泽：遮罩为0处为白色，遮罩均值随画布高度变化，见 add_xuan_paper_texture_enhanced
+        "shading": {"scale": 100, "mean": 0.73, "std": 0.98, "depth": 0, "color": (255, 255, 255)},
+        "wax_sheen": None,
+    },
+    "rice_enhanced": {
+        "description": "米纸",
+        "base_color": (248, 240, 225),
+        "grain": 0,
+        "mottling": None,
+        "roughness": None,
+        "fibers": {"density": 1 / 400, "length": (10, 60), "orientation": None,
+                   "darken": (5, 12), "size": (0, 0), "step": 1},
+        "spots": None,
+        "gold_flakes": None,
+        # 均匀性：稀疏的不均匀斑块，其余部分为更亮的米白色
+        "shading": {"scale": 15, "mean": -24, "std": 14, "depth": 0, "color": (253, 248, 238)},
+        "wax_sheen": None,
+    },
+    "parchment_enhanced": {
+        "description": "羊皮纸",
+        "base_color": (250, 245, 230),
+        "grain": 0,
+        "mottling": None,
+        "roughness": None,
+        # 皮革纹理：偏水平的粗纹
+        "fibers": {"density": 1 / 300, "length": (20, 100), "orientation": (0.0, 0.5),
+                   "darken": ((10, 25), (10, 25), (8, 20)), "size": (0, 1), "step": 1},
+        # 陈旧的污渍
+        "spots": {"density": 1 / 800, "size": (3, 10), "darken": ((15, 35), (15, 35), (10, 25)),
+                  "coverage": 0.6},
+        "gold_flakes": None,
+        # 粗糙表面：细密的粗糙点遮罩，其余部分为较暗的羊皮色
+        "shading": {"scale": 7, "mean": 7, "std": 12, "depth": 0, "color": (240, 235, 220)},
+        "wax_sheen": None,
+    },
+    "authentic": {
+        "description": "纸张",
+        "base_color": (252, 243, 229),
+        "grain": 2,
+        "mottling": None,
+        "roughness": None,
+        "fibers": {"density": 1 / 500, "length": (15, 40), "orientation": None,
+                   "darken": (1, 8), "size": (0, 0), "step": 1},
+        "spots": None,
+        "gold_flakes": None,
+        "shading": None,
+        "wax_sheen": None,
+    },
+}
+
+
+def merge_paper_spec(spec, **overrides):
+    """
+    合并纸张规格（返回副本，不修改原规格）
+
+    覆盖值为字典时与原图层参数合并，例如 fibers={"density": 1 / 100}；
+    为 None 时关闭该图层
+
+    Returns:
+        dict: 纸张规格
+    """
+    spec = copy.deepcopy(spec)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(spec.get(key), dict):
+            spec[key].update(value)
+        else:
+            spec[key] = value
+    return spec
+
+
+def get_paper_spec(paper_type="xuan", **overrides):
+    """
+    获取纸张规格（副本），可覆盖其中的图层参数，合并方式见 merge_paper_spec
+
+    Returns:
+        dict: 纸张规格
+    """
+    return merge_paper_spec(PAPER_SPECS[paper_type], **overrides)
+
+
+def _scale_range(values, scale, minimum):
+    return tuple(max(minimum, int(round(value * scale))) for value in values)
+
+
+def scale_paper_spec(spec, scale):
+    """
+    按比例缩小纸张规格中的特征尺寸（纤维长度/粗细/步长、斑点与金箔大小、各噪声的斑块尺度），
+    用于在缩小的画布上绘制同样外观的纹理；按像素计的密度同时放大 1 / scale²，整张纸上的数量不变
+
+    Returns:
+        dict: 纸张规格（副本）
+    """
+    spec = copy.deepcopy(spec)
+    if spec.get("fibers"):
+        fibers = spec["fibers"]
+        fibers["length"] = _scale_range(fibers["length"], scale, 1)
+        fibers["size"] = _scale_range(fibers["size"], scale, 0)
+        fibers["step"] = max(1, int(round(fibers["step"] * scale)))
+    for layer in ("fibers", "spots", "gold_flakes"):
+        if spec.get(layer):
+            spec[layer]["density"] = spec[layer]["density"] / (scale * scale)
+            if layer != "fibers":
+                spec[layer]["size"] = _scale_range(spec[layer]["size"], scale, 0)
+    for layer in ("mottling", "roughness", "shading", "wax_sheen"):
+        if spec.get(layer):
+            spec[layer]["scale"] = max(1.0, spec[layer]["scale"] * scale)
+    return spec
+
+
+def _paint_ids(pixels, ids, colors, coverage=1.0, rng=None):
+    """按编号缓冲区把颜色写入像素（编号 -1 表示未绘制），coverage < 1 时每个像素按该概率着色"""
+    painted = ids >= 0
+    if coverage < 1:
+        painted &= rng.random(ids.shape) < coverage
+    pixels[painted] = colors[ids[painted]]
+
+
+def _draw_darkened_colors(base_color, darken, count, rng):
+    """每个纤维/斑点的颜色：底色减去随机变暗量（见 PAPER_SPECS 的变暗量说明）"""
+    if isinstance(darken[0], (tuple, list)):
+        amounts = np.stack([rng.integers(low, high + 1, count) for low, high in darken], axis=1)
+    else:
+        amounts = rng.integers(darken[0], darken[1] + 1, (count, 3))
+    return np.maximum(0, np.array(base_color) - amounts)
+
+
+def _stamp_ids(ids, ys, xs, values, sizes, shape="disc"):
+    """把编号按形状（圆点或边长 2·size+1 的方块）写入编号缓冲区，后写的覆盖先写的"""
+    if shape == "square":
+        height, width = ids.shape
+        square_ys, square_xs, index = sample_square_points(xs, ys, sizes, width, height)
+        order = np.argsort(index, kind='stable')
+        ids[square_ys[order], square_xs[order]] = np.asarray(values)[index[order]]
+    elif shape == "disc":
+        stamp_discs(ids, ys, xs, values, sizes, mode="set")
+    else:
+        raise ValueError(f"未知的形状: {shape}，可选: disc, square")
+
+
+def _render_fibers(pixels, fibers, base_color, rng):
+    height, width = pixels.shape[:2]
+    count = int(width * height * fibers["density"])
+    if count <= 0:
+        return
+
+    if fibers["orientation"] is None:
+        angles = rng.uniform(0, 2 * math.pi, count)
+    else:
+        center, spread = fibers["orientation"]
+        angles = center + spread * rng.standard_normal(count)
+
+    ys, xs, fiber_index = sample_segment_points(
+        rng.integers(0, width + 1, count),
+        rng.integers(0, height + 1, count),
+        angles,
+        rng.integers(fibers["length"][0], fibers["length"][1] + 1, count),
+        width, height, fibers["step"]
+    )
+
+    # 纤维颜色（稍暗），每根纤维各通道独立
+    colors = _draw_darkened_colors(base_color, fibers["darken"], count, rng)
+
+    ids = np.full((height, width), -1, dtype=np.int64)
+    radii = rng.integers(fibers["size"][0], fibers["size"][1] + 1, len(ys))
+    _stamp_ids(ids, ys, xs, fiber_index, radii, fibers.get("shape", "disc"))
+    _paint_ids(pixels, ids, colors, fibers.get("coverage", 1.0), rng)
+
+
+def _render_spots(pixels, spots, base_color, rng):
+    height, width = pixels.shape[:2]
+    count = int(width * height * spots["density"])
+    if count <= 0:
+        return
+
+    colors = _draw_darkened_colors(base_color, spots["darken"], count, rng)
+
+    ids = np.full((height, width), -1, dtype=np.int64)
+    _stamp_ids(ids, rng.integers(0, height, count), rng.integers(0, width, count), np.arange(count),
+               rng.integers(spots["size"][0], spots["size"][1] + 1, count), spots.get("shape", "disc"))
+    _paint_ids(pixels, ids, colors, spots.get("coverage", 1.0), rng)
+
+
+def _render_gold_flakes(pixels, flakes, rng):
+    """洒金：每片金箔由若干相邻小圆点组成不规则形状"""
+    height, width = pixels.shape[:2]
+    count = int(width * height * flakes["density"])
+    if count <= 0:
+        return
+
+    parts = rng.integers(flakes["cluster"][0], flakes["cluster"][1] + 1, count)
+    flake_index = np.repeat(np.arange(count), parts)
+    spread = flakes["size"][1] + 1
+    ys = rng.integers(0, height, count)[flake_index] + rng.integers(-spread, spread + 1, len(flake_index))
+    xs = rng.integers(0, width, count)[flake_index] + rng.integers(-spread, spread + 1, len(flake_index))
+
+    shade = rng.integers(-flakes["variation"], flakes["variation"] + 1, count)
+    colors = np.clip(np.array(flakes["color"])[None, :] + shade[:, None], 0, 255)
+
+    ids = np.full((height, width), -1, dtype=np.int64)
+    stamp_discs(ids, ys, xs, flake_index,
+                rng.integers(flakes["size"][0], flakes["size"][1] + 1, len(flake_index)), mode="set")
+    _paint_ids(pixels, ids, colors)
+
+
+def render_paper_texture(width, height, paper_type="xuan", seed=None, spec=None, **overrides):
+    """
+    按纸张规格生成纹理（所有图层均为整体数组运算）
+
+    草稿/校样质量档位下在缩小的画布上按缩小的特征尺寸绘制，再放大到原尺寸
+
+    Args:
+        width, height: 尺寸
+        paper_type: PAPER_SPECS 中的纸张类型 - "xuan" / "rice" / "parchment" / "sajin" / "lajian"
+        seed: 随机种子
+        spec: 自定义纸张规格（可选，优先于 paper_type）
+        **overrides: 覆盖规格中的图层参数，见 get_paper_spec
+
+    Returns:
+        Image: RGB 纹理
+    """
+    if spec is None:
+        spec = get_paper_spec(paper_type, **overrides)
+    elif overrides:
+        spec = merge_paper_spec(spec, **overrides)
+
+    print(f"创建{spec['description']}纹理...")
+
+    def render(render_width, render_height, scale):
+        render_spec = spec if scale >= 1 else scale_paper_spec(spec, scale)
+        return _render_paper_pixels(render_width, render_height, render_spec, seed)
+
+    return render_at_sampling_scale(width, height, render)
+
+
+def _render_paper_pixels(width, height, spec, seed):
+    """按纸张规格绘制纹理（render_paper_texture 的实际绘制部分）"""
+    rng = np.random.default_rng(seed)
+    base_color = spec["base_color"]
+
+    pixels = np.empty((height, width, 3), dtype=np.float32)
+    pixels[:] = base_color
+
+    # 底色的细微变化
+    if spec.get("grain"):
+        pixels += rng.integers(-spec["grain"], spec["grain"] + 1, (height, width, 1))
+
+    # 云状深浅
+    mottling = spec.get("mottling")
+    if mottling:
+        noise = smooth_noise(width, height, mottling["scale"], rng, mottling.get("octaves", 1))
+        pixels -= np.clip(mottling["strength"] + mottling["variation"] * noise, 0, None)[..., None]
+
+    # 细微粗糙感
+    roughness = spec.get("roughness")
+    if roughness:
+        noise = smooth_noise(width, height, roughness["scale"], rng)
+        pixels -= (roughness["strength"] * np.abs(noise))[..., None]
+
+    pixels = np.clip(np.rint(pixels), 0, 255)
+
+    if spec.get("fibers"):
+        _render_fibers(pixels, spec["fibers"], base_color, rng)
+
+    if spec.get("spots"):
+        _render_spots(pixels, spec["spots"], base_color, rng)
+
+    if spec.get("gold_flakes"):
+        _render_gold_flakes(pixels, spec["gold_flakes"], rng)
+
+    # 纸张起伏的光照：遮罩为255处保持原色，为0处变暗 depth
+    shading = spec.get("shading")
+    if shading:
+        noise = smooth_noise(width, height, shading["scale"], rng)
+        mask = np.rint(np.clip(shading["mean"] + shading["std"] * noise, 0, 255)) / 255.0
+        shade_color = np.array(shading.get("color") or np.maximum(0, np.array(base_color) - shading["depth"]))
+        pixels = pixels * mask[..., None] + shade_color * (1 - mask[..., None])
+
+    # 蜡光：横向拉伸的斑块提亮
+    sheen = spec.get("wax_sheen")
+    if sheen:
+        stretch = sheen["stretch"]
+        noise = smooth_noise(max(1, width // stretch), height, sheen["scale"] / stretch, rng)
+        noise = np.array(Image.fromarray(noise, 'F').resize((width, height), Image.BICUBIC))
+        pixels += (255 - pixels) * (sheen["strength"] * np.clip(noise, 0, None))[..., None]
+
+    return Image.fromarray(np.clip(np.rint(pixels), 0, 255).astype(np.uint8), 'RGB')
@@ -0,0 +1,268 @@
+from PIL import Image, ImageFilter
+import numpy as np
+
+
+def sample_segment_points(x_starts, y_starts, angles, lengths, width, height, step=1):
+    """
+    批量沿线段取点（纤维、划痕等），与逐点循环
+    px = int(x + i·cos(angle)), py = int(y + i·sin(angle)), i = 0, step, 2·step, ... < length
+    的取点结果一致
+
+    Args:
+        x_starts, y_starts: 起点坐标数组
+        angles: 方向（弧度）数组
+        lengths: 长度数组
+        width, height: 画布尺寸（超出画布的点被丢弃）
+        step: 取点步长
+
+    Returns:
+        tuple: (ys, xs, 线段编号)，只包含画布内的点
+    """
+    x_starts = np.asarray(x_starts, dtype=np.float64)
+    y_starts = np.asarray(y_starts, dtype=np.float64)
+    angles = np.asarray(angles, dtype=np.float64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+
+    counts = np.maximum(0, -(-lengths // step))
+    segment = np.repeat(np.arange(len(lengths)), counts)
+    offsets = (np.arange(len(segment)) - np.repeat(np.cumsum(counts) - counts, counts)) * step
+
+    # astype 向零截断，与 int() 一致
+    xs = (x_starts[segment] + offsets * np.cos(angles[segment])).astype(np.int64)
+    ys = (y_starts[segment] + offsets * np.sin(angles[segment])).astype(np.int64)
+
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    return ys[inside], xs[inside], segment[inside]
+
+
+def sample_square_points(x_centers, y_centers, sizes, width, height):
+    """
+    批量展开方形斑点（边长 2·size+1）覆盖的像素
+
+    Returns:
+        tuple: (ys, xs, 斑点编号)，只包含画布内的点
+    """
+    x_centers = np.asarray(x_centers, dtype=np.int64)
+    y_centers = np.asarray(y_centers, dtype=np.int64)
+    sizes = np.asarray(sizes, dtype=np.int64)
+
+    all_ys, all_xs, all_ids = [], [], []
+    for size in np.unique(sizes):
+        selected = np.nonzero(sizes == size)[0]
+        dy, dx = np.mgrid[-size:size + 1, -size:size + 1]
+        ys = (y_centers[selected][:, None] + dy.ravel()[None, :]).ravel()
+        xs = (x_centers[selected][:, None] + dx.ravel()[None, :]).ravel()
+        ids = np.repeat(selected, dy.size)
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        all_ys.append(ys[inside])
+        all_xs.append(xs[inside])
+        all_ids.append(ids[inside])
+
+    if not all_ys:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    return np.concatenate(all_ys), np.concatenate(all_xs), np.concatenate(all_ids)
+
+
+def sample_disc_points(x_centers, y_centers, sizes, width, height):
+    """
+    批量展开圆形斑点（dx² + dy² <= size²）覆盖的像素
+
+    Returns:
+        tuple: (ys, xs, 斑点编号)，只包含画布内的点，按斑点编号排序
+    """
+    x_centers = np.asarray(x_centers, dtype=np.int64)
+    y_centers = np.asarray(y_centers, dtype=np.int64)
+    sizes = np.asarray(sizes, dtype=np.int64)
+
+    all_ys, all_xs, all_ids = [], [], []
+    for size in np.unique(sizes):
+        selected = np.nonzero(sizes == size)[0]
+        dy, dx = np.mgrid[-size:size + 1, -size:size + 1]
+        inside_disc = dx * dx + dy * dy <= size * size
+        dy, dx = dy[inside_disc], dx[inside_disc]
+        ys = (y_centers[selected][:, None] + dy[None, :]).ravel()
+        xs = (x_centers[selected][:, None] + dx[None, :]).ravel()
+        ids = np.repeat(selected, len(dy))
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        all_ys.append(ys[inside])
+        all_xs.append(xs[inside])
+        all_ids.append(ids[inside])
+
+    if not all_ys:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    ys, xs, ids = np.concatenate(all_ys), np.concatenate(all_xs), np.concatenate(all_ids)
+    order = np.argsort(ids, kind='stable')
+    return ys[order], xs[order], ids[order]
+
+
+def sample_polyline_points(x_points, y_points, line_index):
+    """
+    批量沿折线取点，与逐段循环
+    steps = max(|x2 - x1|, |y2 - y1|), j = 0 ~ steps-1,
+    x = int(x1 + j / steps · (x2 - x1)), y = int(y1 + j / steps · (y2 - y1))
+    的取点结果一致（每段不含终点，长度为0的段不取点）
+
+    Args:
+        x_points, y_points: 所有折线的顶点坐标（按折线依次排列）
+        line_index: 每个顶点所属的折线编号（同一折线的顶点相邻）
+
+    Returns:
+        tuple: (ys, xs, 折线编号)，按绘制顺序排列，未裁剪到画布
+    """
+    x_points = np.asarray(x_points, dtype=np.int64)
+    y_points = np.asarray(y_points, dtype=np.int64)
+    line_index = np.asarray(line_index)
+
+    # 相邻且属于同一折线的两个顶点构成一段
+    same_line = line_index[1:] == line_index[:-1]
+    x1, y1 = x_points[:-1][same_line], y_points[:-1][same_line]
+    dx = x_points[1:][same_line] - x1
+    dy = y_points[1:][same_line] - y1
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+
+    segment = np.repeat(np.arange(len(steps)), steps)
+    j = np.arange(len(segment)) - np.repeat(np.cumsum(steps) - steps, steps)
+    t = j / steps[segment]
+
+    # astype 向零截断，与 int() 一致
+    xs = (x1[segment] + t * dx[segment]).astype(np.int64)
+    ys = (y1[segment] + t * dy[segment]).astype(np.int64)
+    return ys, xs, line_index[:-1][same_line][segment]
+
+
+def accumulate_points(shape, ys, xs, weights=None):
+    """
+    把点的数值累加到画布上（同一像素多次命中时求和）
+
+    Returns:
+        numpy.ndarray: float64 累加结果
+    """
+    height, width = shape
+    flat_index = np.asarray(ys, dtype=np.int64) * width + np.asarray(xs, dtype=np.int64)
+    return np.bincount(flat_index, weights=weights, minlength=height * width).reshape(height, width)
+
+
+def darken_with_floor(values, ys, xs, amounts, floor):
+    """
+    逐点变暗并限制下限，等价于对每个点依次执行 v = max(floor, v - amount)
+
+    依次执行的结果只取决于总变暗量：被命中的像素为 max(floor, v - Σamount)
+    （原本低于下限的像素被命中后会提升到下限），未命中的像素保持不变
+
+    Args:
+        values: 二维数组
+        ys, xs: 点坐标
+        amounts: 每个点的变暗量
+        floor: 下限
+
+    Returns:
+        numpy.ndarray: 新数组（与 values 同类型）
+    """
+    total = accumulate_points(values.shape, ys, xs, amounts)
+    touched = accumulate_points(values.shape, ys, xs) > 0
+    darkened = np.maximum(floor, values.astype(np.float64) - total)
+    return np.where(touched, darkened, values).astype(values.dtype)
+
+
+def smooth_noise(width, height, scale, rng, octaves=1, persistence=0.5):
+    """
+    带限平滑噪声（多倍频程值噪声）：在低分辨率网格上生成随机值，双三次插值放大后叠加
+
+    计算量只取决于 (width / scale) × (height / scale)，与斑块大小无关
+
+    Args:
+        width, height: 输出尺寸
+        scale: 最大斑块尺度（像素）
+        rng: numpy 随机数生成器
+        octaves: 倍频程数，每一层尺度减半
+        persistence: 每一层的振幅衰减
+
+    Returns:
+        numpy.ndarray: float32 噪声，均值0、标准差1
+    """
+    total = np.zeros((height, width), dtype=np.float32)
+    amplitude = 1.0
+
+    for octave in range(octaves):
+        cell = max(1.0, scale / 2 ** octave)
+        grid_width = int(np.ceil(width / cell)) + 4
+        grid_height = int(np.ceil(height / cell)) + 4
+        grid = Image.fromarray(rng.standard_normal((grid_height, grid_width)).astype(np.float32), 'F')
+        layer = grid.resize((int(round(grid_width * cell)), int(round(grid_height * cell))), Image.BICUBIC)
+
+        # 随机偏移，避免各层网格对齐
+        offset_x = int(rng.integers(int(cell) + 1)) + int(cell)
+        offset_y = int(rng.integers(int(cell) + 1)) + int(cell)
+        total += amplitude * np.array(layer)[offset_y:offset_y + height, offset_x:offset_x + width]
+        amplitude *= persistence
+
+    total -= total.mean()
+    std = total.std()
+    if std > 0:
+        total /= std
+    return total
+
+
+def get_low_res_scale(blur_radius, max_scale=8):
+    """根据模糊半径选择低分辨率计算的缩小倍数（1 ~ max_scale）"""
+    return max(1, min(max_scale, int(blur_radius)))
+
+
+def render_blurred_layer(width, height, blur_radius, draw_layer, max_scale=8):
+    """
+    低分辨率计算 + 放大：用于绘制后立即大半径模糊的平滑图层
+
+    图层在缩小 scale 倍的画布上绘制并模糊（半径同样缩小），再双三次插值放大，
+    计算量约为全分辨率的 1 / scale²
+
+    Args:
+        width, height: 输出尺寸
+        blur_radius: 全分辨率下的高斯模糊半径
+        draw_layer: 绘制函数 draw_layer(small_width, small_height, scale)，返回 'L' 图像
+        max_scale: 最大缩小倍数
+
+    Returns:
+        Image: 'L' 图层 (width, height)
+    """
+    scale = get_low_res_scale(blur_radius, max_scale)
+    small_width = -(-width // scale)
+    small_height = -(-height // scale)
+
+    layer = draw_layer(small_width, small_height, scale)
+    layer = layer.filter(ImageFilter.GaussianBlur(blur_radius / scale))
+    if scale > 1:
+        layer = layer.resize((small_width * scale, small_height * scale), Image.BICUBIC)
+        layer = layer.crop((0, 0, width, height))
+    return layer
+
+
+def downsample_points(shape, ys, xs, values, scale):
+    """
+    把全分辨率的稀疏点（同一像素取最大值）按 scale×scale 块求平均，得到低分辨率图层
+
+    与“先在全分辨率上绘制再缩小”一致，而计算量只与点数有关
+
+    Args:
+        shape: 低分辨率尺寸 (small_height, small_width)
+        ys, xs: 全分辨率点坐标
+        values: 点的数值
+        scale: 缩小倍数
+
+    Returns:
+        numpy.ndarray: float64 低分辨率图层
+    """
+    ys = np.asarray(ys, dtype=np.int64)
+    xs = np.asarray(xs, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+
+    # 同一全分辨率像素只保留最大值
+    full_width = shape[1] * scale
+    flat_index = ys * full_width + xs
+    order = np.lexsort((-values, flat_index))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = flat_index[order][1:] != flat_index[order][:-1]
+    kept = order[first]
+
+    return accumulate_points(shape, ys[kept] // scale, xs[kept] // scale, values[kept]) / (scale * scale)
@@ -0,0 +1,197 @@
+from PIL import Image
+from collections import OrderedDict
+import hashlib
+import os
+import numpy as np
+
+from .render_quality import get_render_quality_tier
+
+# 纸张纹理贴图缓存（内存 LRU + 可选磁盘缓存）
+_TILE_CACHE = OrderedDict()
+_TILE_CACHE_SETTINGS = {
+    'cache_dir': None,   # 磁盘缓存目录，None 表示只缓存在内存中
+    'max_items': 16,     # 内存中最多保留的贴图数量（512 见方的贴图约 0.75MB）
+}
+
+
+def _get_generators():
+    """可平铺的纹理生成器（延迟导入，避免与各纹理模块循环导入）"""
+    from .paper_texture_xuan import add_xuan_paper_texture_enhanced
+    from .paper_texture_rice import add_rice_paper_texture_enhanced
+    from .paper_texture_parchment import add_parchment_texture_enhanced
+    from .paper_texture_type import create_realistic_paper_texture
+
+    return {
+        'xuan_enhanced': add_xuan_paper_texture_enhanced,
+        'rice_enhanced': add_rice_paper_texture_enhanced,
+        'parchment_enhanced': add_parchment_texture_enhanced,
+        'realistic': create_realistic_paper_texture,
+    }
+
+
+def configure_paper_tile_cache(cache_dir=None, max_items=16):
+    """
+    配置纸张纹理贴图缓存
+
+    Args:
+        cache_dir: 磁盘缓存目录（可选），同一纸张类型的贴图在多次运行之间复用
+        max_items: 内存 LRU 容量（按种子批量生成时超出的最久未用贴图被丢弃）
+    """
+    _TILE_CACHE_SETTINGS['cache_dir'] = cache_dir
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    _TILE_CACHE_SETTINGS['max_items'] = max(1, int(max_items))
+    while len(_TILE_CACHE) > _TILE_CACHE_SETTINGS['max_items']:
+        _TILE_CACHE.popitem(last=False)
+
+
+def clear_paper_tile_cache():
+    """清空内存缓存（磁盘缓存保留）"""
+    _TILE_CACHE.clear()
+
+
+def make_seamless_tile(texture, tile_size, blend):
+    """
+    把 (tile_size + blend) 见方的纹理做成可无缝环绕的 tile_size 贴图
+
+    右侧（下侧）多出的 blend 像素与左侧（上侧）交叉淡化，
+    贴图的右边缘与左边缘、下边缘与上边缘因此连续
+
+    Args:
+        texture: 纹理数组 (tile_size + blend, tile_size + blend, 通道)
+        tile_size: 贴图尺寸
+        blend: 交叉淡化宽度
+
+    Returns:
+        numpy.ndarray: float32 贴图 (tile_size, tile_size, 通道)
+    """
+    data = texture.astype(np.float32)
+    ramp = ((np.arange(blend) + 0.5) / blend).astype(np.float32)
+
+    # 水平方向：左侧 blend 列从“右侧延伸部分”渐变到原内容
+    weight = ramp[None, :, None]
+    data[:, :blend] = data[:, tile_size:tile_size + blend] * (1 - weight) + data[:, :blend] * weight
+    data = data[:, :tile_size]
+
+    # 垂直方向同理
+    weight = ramp[:, None, None]
+    data[:blend] = data[tile_size:tile_size + blend] * (1 - weight) + data[:blend] * weight
+    return data[:tile_size]
+
+
+def get_paper_texture_tile(generator, tile_size=512, seed=0, **params):
+    """
+    获取可平铺的纸张纹理贴图（带 LRU 缓存），缓存键为 (生成器, 参数, 尺寸, 种子, 渲染质量档位)
+
+    Args:
+        generator: 'xuan_enhanced' / 'rice_enhanced' / 'parchment_enhanced' / 'realistic'
+        tile_size: 贴图尺寸
+        seed: 随机种子（决定贴图内容）
+        **params: 传给生成器的其他参数（如 realistic 的 paper_type）
+
+    Returns:
+        numpy.ndarray: uint8 贴图 (tile_size, tile_size, 3)
+    """
+    key = (generator, tuple(sorted(params.items())), tile_size, seed, get_render_quality_tier())
+    if key in _TILE_CACHE:
+        _TILE_CACHE.move_to_end(key)
+        return _TILE_CACHE[key]
+
+    cache_dir = _TILE_CACHE_SETTINGS['cache_dir']
+    cache_path = None
+    if cache_dir:
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f"paper_tile_{generator}_{digest}.png")
+
+    if cache_path and os.path.exists(cache_path):
+        with Image.open(cache_path) as cached:
+            tile = np.array(cached.convert('RGB'))
+    else:
+        blend = max(8, tile_size // 8)
+        print(f"生成纸张纹理贴图: {generator} {tile_size}×{tile_size}")
+
+        texture = _get_generators()[generator](tile_size + blend, tile_size + blend, seed=seed, **params)
+
+        tile = make_seamless_tile(np.array(texture.convert('RGB')), tile_size, blend)
+        tile = np.clip(np.rint(tile), 0, 255).astype(np.uint8)
+        if cache_path:
+            Image.fromarray(tile).save(cache_path)
+
+    _TILE_CACHE[key] = tile
+    while len(_TILE_CACHE) > _TILE_CACHE_SETTINGS['max_items']:
+        _TILE_CACHE.popitem(last=False)
+    return tile
+
+
+def assemble_tiled_texture(tile, width, height, seed=None, overlap=None):
+    """
+    用贴图拼出任意尺寸的纹理
+
+    每个格子随机平移（贴图可环绕）并随机水平/垂直翻转以隐藏重复，
+    相邻格子重叠 overlap 像素并羽化混合，避免接缝
+
+    Args:
+        tile: 可无缝环绕的贴图数组
+        width, height: 目标尺寸
+        seed: 排布的随机种子（None 则每次不同）
+        overlap: 重叠宽度（默认贴图尺寸的 1/8）
+
+    Returns:
+        Image: RGB 纹理
+    """
+    rng = np.random.default_rng(seed)
+    tile = tile.astype(np.float32)
+    tile_size = tile.shape[0]
+    if overlap is None:
+        overlap = max(4, tile_size // 8)
+    stride = tile_size - overlap
+
+    # 羽化权重：中间为1，四周 overlap 范围内渐变到接近0
+    ramp = np.minimum(1.0, (np.arange(tile_size) + 0.5) / overlap)
+    ramp = np.minimum(ramp, ramp[::-1]).astype(np.float32)
+    feather = (ramp[:, None] * ramp[None, :])[..., None]
+
+    rows = max(1, -(-(height - overlap) // stride))
+    cols = max(1, -(-(width - overlap) // stride))
+    canvas_height = (rows - 1) * stride + tile_size
+    canvas_width = (cols - 1) * stride + tile_size
+    total = np.zeros((canvas_height, canvas_width, tile.shape[2]), dtype=np.float32)
+    weight = np.zeros((canvas_height, canvas_width, 1), dtype=np.float32)
+
+    for row in range(rows):
+        for col in range(cols):
+            piece = np.roll(tile, (rng.integers(tile_size), rng.integers(tile_size)), axis=(0, 1))
+            if rng.random() < 0.5:
+                piece = piece[:, ::-1]
+            if rng.random() < 0.5:
+                piece = piece[::-1]
+
+            y, x = row * stride, col * stride
+            total[y:y + tile_size, x:x + tile_size] += piece * feather
+            weight[y:y + tile_size, x:x + tile_size] += feather
+
+    # 画布四周只有一块贴图覆盖，羽化权重虽小但比例不变
+    result = total / np.maximum(weight, 1e-6)
+    result = np.clip(np.rint(result[:height, :width]), 0, 255).astype(np.uint8)
+    return Image.fromarray(result, 'RGB')
+
+
+def create_tiled_paper_texture(generator, width, height, seed=None, tile_size=512, **params):
+    """
+    平铺模式的纸张纹理：贴图只生成一次（按纸张类型、参数、种子缓存），之后任意尺寸直接拼接
+
+    不传 seed 时，同一纸张类型和贴图尺寸的所有作品共用同一张贴图（种子 0），
+    只有排布随机，纹理细节会在作品之间重复；需要每幅作品各不相同时传入 seed
+
+    Args:
+        generator: 纹理生成器名称，见 get_paper_texture_tile
+        width, height: 目标尺寸
+        seed: 随机种子 - 决定贴图内容和排布；None 时使用默认贴图、随机排布
+        tile_size: 贴图尺寸
+        **params: 传给生成器的其他参数
+
+    Returns:
+        Image: RGB 纹理
+    """
+    tile = get_paper_texture_tile(generator, tile_size, 0 if seed is None else seed, **params)
+    return assemble_tiled_texture(tile, width, height, seed)
@@ -1,92 +1,23 @@
-from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageOps
-import random
-import math
-from Calli_Utils.paper_edge_natural_torn import add_organic_torn_mask, safe_apply_mask
+from PIL import Image, ImageOps
+import time
+import numpy as np
+from Calli_Utils.paper_edge_natural_torn import add_organic_torn_mask
+from .paper_texture_engine import PAPER_SPECS, render_paper_texture
+from .paper_aging import new_fade_map, add_yellowing_stains, apply_fade_map, apply_fade_map_to_array
 
-def create_realistic_paper_texture(width, height, paper_type="xuan"):
-    """创建真实的纸张纹理"""
-    
-    # 根据纸张类型设置参数
-    if paper_type == "xuan":
-        base_color = (242, 232, 212)  # 宣纸色
-        fiber_density = width * height // 400
-        spot_density = width * height // 800
-    elif paper_type == "rice":
-        base_color = (248, 240, 225)  # 米纸色
-        fiber_density = width * height // 300
-        spot_density = width * height // 600
-    else:  # parchment
-        base_color = (250, 245, 230)  # 羊皮纸色
-        fiber_density = width * height // 200
-        spot_density = width * height // 400
-    
-    # 创建基础纹理
-    texture = Image.new('RGB', (width, height), base_color)
-    draw = ImageDraw.Draw(texture)
-    
-    # 添加纤维纹理
-    for _ in range(fiber_density):
-        x1 = random.randint(0, width)
-        y1 = random.randint(0, height)
-        length = random.randint(30, 150)
-        angle = random.uniform(0, 2 * math.pi)
-        
-        # 纤维颜色（稍暗）
-        fiber_color = (
-            max(0, base_color[0] - random.randint(5, 15)),
-            max(0, base_color[1] - random.randint(5, 15)),
-            max(0, base_color[2] - random.randint(5, 15))
-        )
-        
-        # 绘制纤维
-        for i in range(0, length, 2):
-            px = int(x1 + i * math.cos(angle))
-            py = int(y1 + i * math.sin(angle))
-            if 0 <= px < width and 0 <= py < height:
-                size = random.randint(1, 2)
-                draw.ellipse([px-size, py-size, px+size, py+size], fill=fiber_color)
-    
-    # 添加纸张斑点
-    for _ in range(spot_density):
-        x = random.randint(0, width-1)
-        y = random.randint(0, height-1)
-        size = random.randint(1, 4)
-        
-        spot_color = (
-            max(0, base_color[0] - random.randint(10, 25)),
-            max(0, base_color[1] - random.randint(10, 25)),
-            max(0, base_color[2] - random.randint(10, 25))
-        )
-        
-        draw.ellipse([x-size, y-size, x+size, y+size], fill=spot_color)
-    
-    # 添加光照效果（模拟纸张起伏）
-    gradient = Image.new('L', (width, height), 255)
-    g_draw = ImageDraw.Draw(gradient)
-    
-    for _ in range(width // 10):
-        x = random.randint(0, width)
-        y = random.randint(0, height)
-        radius = random.randint(50, 200)
-        
-        for r in range(radius, 0, -5):
-            alpha = int(255 * (1 - r/radius))
-            g_draw.ellipse([x-r, y-r, x+r, y+r], fill=alpha)
-    
-    gradient = gradient.filter(ImageFilter.GaussianBlur(20))
-    
-    # 应用光照效果
-    texture = Image.composite(
-        texture,
-        Image.new('RGB', (width, height), (
-            max(0, base_color[0] - 10),
-            max(0, base_color[1] - 10),
-            max(0, base_color[2] - 10)
-        )),
-        gradient
-    )
-    
-    return texture
+def create_realistic_paper_texture(width, height, paper_type="xuan", tiled=False, seed=None):
+    """
+    创建真实的纸张纹理
+    
+    paper_type 为 paper_texture_engine.PAPER_SPECS 中的类型（xuan / rice / parchment / sajin / lajian）；
+    tiled=True 时使用缓存的可平铺贴图拼接（贴图只生成一次），seed 决定纹理（平铺模式下同时决定排布）
+    """
+    if tiled:
+        from .paper_texture_tiles import create_tiled_paper_texture
+        return create_tiled_paper_texture("realistic", width, height, seed, paper_type=paper_type)
+    
+    # 由纸张规格引擎生成（未知类型按羊皮纸处理）
+    return render_paper_texture(width, height, paper_type if paper_type in PAPER_SPECS else "parchment", seed)
 
 def apply_paper_texture(image, paper_type="xuan"):
     """将纸张纹理应用到图像"""
@@ -103,119 +34,128 @@ def apply_paper_texture(image, paper_type="xuan"):
     
     return result
 
-def create_authentic_paper_texture(width, height, paper_type="xuan"):
-    """创建真实的纸张纹理"""
-    if paper_type == "xuan":
-        base_color = (251, 245, 235)
-    else:
-        base_color = (252, 243, 229)
-    
-    img = Image.new('RGB', (width, height), base_color)
-    pixels = img.load()  # 使用load()方法提高性能
-    
-    # 添加细微的颜色变化
-    for i in range(width):
-        for j in range(height):
-            r, g, b = base_color
-            # 非常细微的颜色变化
-            variation = random.randint(-2, 2)
-            pixels[i, j] = (
-                max(0, min(255, r + variation)),
-                max(0, min(255, g + variation)),
-                max(0, min(255, b + variation))
-            )
-    
-    # 添加纤维纹理
-    draw = ImageDraw.Draw(img)
-    for _ in range(width * height // 500):  # 适量的纤维
-        x1 = random.randint(0, width-1)
-        y1 = random.randint(0, height-1)
-        length = random.randint(15, 40)
-        angle = random.uniform(0, math.pi)
-        
-        x2 = min(width-1, max(0, int(x1 + length * math.cos(angle))))
-        y2 = min(height-1, max(0, int(y1 + length * math.sin(angle))))
-        
-        # 确保坐标有效
-        if 0 <= x1 < width and 0 <= y1 < height and 0 <= x2 < width and 0 <= y2 < height:
-            # 非常细微的颜色变化
-            darken = random.uniform(0.97, 0.995)
-            r, g, b = pixels[x1, y1]
-            fiber_color = (
-                int(r * darken),
-                int(g * darken), 
-                int(b * darken)
-            )
-            
-            draw.line([(x1, y1), (x2, y2)], fill=fiber_color, width=1)
-    
-    return img
+def create_authentic_paper_texture(width, height, paper_type="xuan", seed=None):
+    """创建真实的纸张纹理（纸张规格引擎的 "authentic" 规格，宣纸底色略白，适合 large_xuan 尺寸的交互预览）"""
+    overrides = {"base_color": (251, 245, 235)} if paper_type == "xuan" else {}
+    return render_paper_texture(width, height, "authentic", seed, **overrides)
 
-def add_realistic_aging(paper_img, intensity=0.2):
-    """添加真实的老化效果"""
+def get_realistic_aging_fade(width, height, intensity=0.2, seed=None):
+    """真实老化效果的衰减图：半径 2-8 的细微色斑，轻微变黄"""
+    rng = np.random.default_rng(seed)
+    fade_map = new_fade_map((height, width))
+    add_yellowing_stains(fade_map, int(25 * intensity), (2, 8), rng)
+    return fade_map
+
+def add_realistic_aging(paper_img, intensity=0.2, seed=None):
+    """添加真实的老化效果（所有色斑一次性盖章，整体只处理一遍像素）"""
     width, height = paper_img.size
-    aged_img = paper_img.copy()
-    pixels = aged_img.load()  # 使用load()方法
-    
-    # 1. 细微的色斑
-    for _ in range(int(25 * intensity)):
-        center_x = random.randint(0, width-1)
-        center_y = random.randint(0, height-1)
-        radius = random.randint(2, 8)  # 小斑点
-        
-        for i in range(max(0, center_x-radius), min(width, center_x+radius)):
-            for j in range(max(0, center_y-radius), min(height, center_y+radius)):
-                # 确保坐标有效
-                if 0 <= i < width and 0 <= j < height:
-                    dist = math.sqrt((i-center_x)**2 + (j-center_y)**2)
-                    if dist < radius:
-                        r, g, b = pixels[i, j]
-                        # 轻微变黄
-                        fade = 1.0 - (dist / radius) * 0.1
-                        pixels[i, j] = (
-                            int(r * fade),
-                            int(g * fade * 0.98),
-                            int(b * fade * 0.95)
-                        )
-    
-    return aged_img
+    return apply_fade_map(paper_img, get_realistic_aging_fade(width, height, intensity, seed))
+
+# 纸张尺寸预设（像素）
+PAPER_SIZES = {
+    "small_xuan": (400, 600),  # 减小尺寸便于测试
+    "medium_xuan": (600, 800),
+    "large_xuan": (1600, 800),
+    "handscroll": (800, 200),
+    "tall-handscroll": (1500, 500),
+    "wide-handscroll": (1600, 400),
+    "album_leaf": (400, 500),
+}
+
+# 传统宣纸规格（宽 × 高，厘米），按 dpi 换算为像素
+PHYSICAL_PAPER_SIZES = {
+    "四尺整张": (138, 69),
+    "四尺斗方": (69, 69),
+    "四尺条幅": (34.5, 138),
+    "四尺横幅": (138, 34.5),
+    "六尺整张": (180, 97),
+    "八尺整张": (248, 129),
+}
+
+def resolve_paper_size(paper_size, dpi=150):
+    """
+    把纸张尺寸解析为像素
+    
+    Args:
+        paper_size: PAPER_SIZES 中的名称、PHYSICAL_PAPER_SIZES 中的传统规格、
+                    (width, height) 像素元组，或 (宽, 高, "cm") 厘米元组
+        dpi: 厘米尺寸的换算精度
+    
+    Returns:
+        tuple: (width, height)
+    """
+    if isinstance(paper_size, str):
+        if paper_size in PAPER_SIZES:
+            return PAPER_SIZES[paper_size]
+        if paper_size in PHYSICAL_PAPER_SIZES:
+            paper_size = PHYSICAL_PAPER_SIZES[paper_size] + ("cm",)
+        else:
+            options = ', '.join(list(PAPER_SIZES) + list(PHYSICAL_PAPER_SIZES))
+            raise ValueError(f"未知的纸张尺寸: {paper_size}，可选: {options}，或 (width, height) 元组")
+    
+    if len(paper_size) == 3 and paper_size[2] == "cm":
+        return (max(1, int(round(paper_size[0] / 2.54 * dpi))),
+                max(1, int(round(paper_size[1] / 2.54 * dpi))))
+    
+    width, height = paper_size
+    return int(width), int(height)
 
 # entry function
-def create_authentic_torn_paper(paper_size="small_xuan", paper_type="xuan", tear_intensity=0.4):
-    """创建真实的撕边纸张"""
-    PAPER_SIZES = {
-        "small_xuan": (400, 600),  # 减小尺寸便于测试
-        "medium_xuan": (600, 800),
-        "large_xuan": (1600, 800),
-        "handscroll": (800, 200),
-        "tall-handscroll": (1500, 500),
-        "wide-handscroll": (1600, 400),
-        "album_leaf": (400, 500),
-    }
-    
-    width, height = PAPER_SIZES.get(paper_size, (400, 600))
+def create_authentic_torn_paper(paper_size="small_xuan", paper_type="xuan", tear_intensity=0.4,
+                                dpi=150, seed=None, report_timing=False):
+    """
+    创建真实的撕边纸张（纹理、撕边蒙版和老化均直接按目标尺寸生成，无需再缩放）
+    
+    Args:
+        paper_size: 纸张尺寸 - 预设名称（如 "large_xuan"）、传统规格（如 "四尺整张"）、
+                    (width, height) 像素元组，或 (宽, 高, "cm") 厘米元组
+        paper_type: 纸张类型
+        tear_intensity: 撕边强度
+        dpi: 厘米尺寸的换算精度
+        seed: 随机种子 - 决定纹理、撕边和老化
+        report_timing: 是否打印各阶段耗时
+    """
+    width, height = resolve_paper_size(paper_size, dpi)
     
     print(f"创建真实撕边纸张: {width} × {height}, 撕边强度: {tear_intensity}")
     
+    # 纹理、老化、撕边各用一个由 seed 派生的独立种子（互不相关的随机流）
+    if seed is None:
+        texture_seed = aging_seed = mask_seed = None
+    else:
+        texture_seed, aging_seed, mask_seed = (int(child.generate_state(1)[0])
+                                               for child in np.random.SeedSequence(seed).spawn(3))
+    
+    # 所有阶段都在同一块 RGBA 缓冲区上进行：纹理 → 老化（原地） → 撕边蒙版写入 Alpha
+    pixels = np.empty((height, width, 4), dtype=np.uint8)
+    
+    def texture_stage():
+        texture = create_realistic_paper_texture(width, height, paper_type, seed=texture_seed)
+        pixels[..., :3] = np.asarray(texture if texture.mode == 'RGB' else texture.convert('RGB'))
+    
+    def aging_stage():
+        apply_fade_map_to_array(pixels, get_realistic_aging_fade(width, height, 0.15, aging_seed))
+    
+    def mask_stage():
+        pixels[..., 3] = np.asarray(add_organic_torn_mask(width, height, tear_intensity, seed=mask_seed))
+    
+    stages = [("纹理", texture_stage), ("老化", aging_stage), ("撕边蒙版", mask_stage)]
+    
     try:
-        # 1. 创建基础纹理
-        paper = create_realistic_paper_texture(width, height, paper_type)
-        # paper = create_authentic_paper_texture(width, height, paper_type)
+        timings = []
+        for name, stage in stages:
+            start = time.perf_counter()
+            stage()
+            timings.append((name, time.perf_counter() - start))
         
-        # 2. 创建有机撕边蒙版
-        mask = add_organic_torn_mask(width, height, tear_intensity)
+        if report_timing:
+            total = sum(seconds for _, seconds in timings)
+            print(f"[撕边纸张] 总耗时 {total * 1000:.1f}ms: " +
+                  ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in timings))
         
-        # 3. 安全应用蒙版
-        final_paper = safe_apply_mask(paper, mask)
-        
-        # 4. 添加老化效果
-        aged_paper = add_realistic_aging(paper, intensity=0.15)
-        final_paper_aged = safe_apply_mask(aged_paper, mask)
-        
-        return final_paper_aged
+        return Image.fromarray(pixels, 'RGBA')
         
     except Exception as e:
         print(f"创建纸张时出错: {e}")
         # 返回一个简单的备用图像
         return Image.new('RGBA', (width, height), (255, 255, 255, 255))
-
@@ -4,42 +4,47 @@ import math
 
 from PIL import Image, ImageDraw, ImageFilter, ImageOps, ImageEnhance
 import random, math
+import numpy as np
 
-def add_xuan_paper_texture(width, height, texture_intensity=0.25, invert_mask=True):
+from .paper_texture_engine import render_paper_texture
+from .paper_texture_primitives import sample_segment_points, sample_square_points, darken_with_floor
+from .render_quality import scale_density
+
+def add_xuan_paper_texture(width, height, texture_intensity=0.25, invert_mask=True, seed=None):
     """添加宣纸质感到图像上，支持纹理强度和可选反转"""
     
+    rng = np.random.default_rng(seed)
+    
     # 创建宣纸底色（米黄色）
     paper_base = Image.new('RGB', (width, height), (242, 232, 212))
 
     # 创建纤维纹理层（灰度）
-    fiber_texture = Image.new('L', (width, height), 255)
-    draw = ImageDraw.Draw(fiber_texture)
-
-    # 模拟宣纸纤维（长条状纹理）
-    for _ in range(width * height // 500):
-        x1 = random.randint(0, width)
-        y1 = random.randint(0, height)
-        length = random.randint(20, 100)
-        angle = random.uniform(0, 2 * math.pi)
-
-        for i in range(length):
-            px = int(x1 + i * math.cos(angle))
-            py = int(y1 + i * math.sin(angle))
-            if 0 <= px < width and 0 <= py < height:
-                current = fiber_texture.getpixel((px, py))
-                fiber_texture.putpixel((px, py), max(100, current - random.randint(5, 15)))
-
-    # 添加随机斑点
-    for _ in range(width * height // 1000):
-        x = random.randint(0, width - 1)
-        y = random.randint(0, height - 1)
-        size = random.randint(1, 3)
-        for dx in range(-size, size + 1):
-            for dy in range(-size, size + 1):
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < width and 0 <= ny < height:
-                    current = fiber_texture.getpixel((nx, ny))
-                    fiber_texture.putpixel((nx, ny), max(150, current - random.randint(10, 30)))
+    fiber_values = np.full((height, width), 255, dtype=np.int16)
+
+    # 模拟宣纸纤维（长条状纹理）：所有纤维一次性取点，每点变暗 5~15，不低于 100
+    fiber_count = scale_density(width * height // 500)
+    fiber_ys, fiber_xs, _ = sample_segment_points(
+        rng.integers(0, width + 1, fiber_count),
+        rng.integers(0, height + 1, fiber_count),
+        rng.uniform(0, 2 * math.pi, fiber_count),
+        rng.integers(20, 101, fiber_count),
+        width, height
+    )
+    fiber_values = darken_with_floor(fiber_values, fiber_ys, fiber_xs,
+                                     rng.integers(5, 16, len(fiber_ys)), 100)
+
+    # 添加随机斑点：方形斑点每点变暗 10~30，不低于 150
+    spot_count = scale_density(width * height // 1000)
+    spot_ys, spot_xs, _ = sample_square_points(
+        rng.integers(0, width, spot_count),
+        rng.integers(0, height, spot_count),
+        rng.integers(1, 4, spot_count),
+        width, height
+    )
+    fiber_values = darken_with_floor(fiber_values, spot_ys, spot_xs,
+                                     rng.integers(10, 31, len(spot_ys)), 150)
+
+    fiber_texture = Image.fromarray(fiber_values.astype(np.uint8), 'L')
 
     # 模糊纹理
     fiber_texture = fiber_texture.filter(ImageFilter.GaussianBlur(0.8))
@@ -114,107 +119,34 @@ def add_xuan_paper_texture(width, height, texture_intensity=0.25, invert_mask=Tr
     
     return result
 
-def add_xuan_paper_texture_enhanced(width, height):
-    """增强的宣纸纹理（模仿真实的宣纸特性）"""
-    base_color = (242, 232, 212)  # 宣纸基色
-    texture = Image.new('RGB', (width, height), base_color)
-    draw = ImageDraw.Draw(texture)
-    
-    print("创建宣纸纹理...")
-    
-    # 1. 宣纸纤维纹理（主要特征）
-    for _ in range(width * height // 200):  # 密集的纤维
-        # 长条状纤维（宣纸特点）
-        x1 = random.randint(0, width)
-        y1 = random.randint(0, height)
-        length = random.randint(50, 200)  # 较长的纤维
-        angle = random.uniform(0, math.pi)  # 主要是水平方向
-        
-        # 纤维颜色（比基色稍深）
-        fiber_color = (
-            max(0, base_color[0] - random.randint(8, 15)),
-            max(0, base_color[1] - random.randint(8, 15)),
-            max(0, base_color[2] - random.randint(8, 15))
-        )
-        
-        # 绘制纤维（带有不规则边缘）
-        for i in range(0, length, 3):
-            px = int(x1 + i * math.cos(angle))
-            py = int(y1 + i * math.sin(angle))
-            if 0 <= px < width and 0 <= py < height:
-                # 纤维宽度变化
-                fiber_width = random.randint(1, 3)
-                for w in range(-fiber_width, fiber_width + 1):
-                    for h in range(-fiber_width, fiber_width + 1):
-                        nx, ny = px + w, py + h
-                        if 0 <= nx < width and 0 <= ny < height:
-                            if random.random() < 0.7:  # 不规则分布
-                                texture.putpixel((nx, ny), fiber_color)
-    
-    # 2. 宣纸的云状纹理（手工造纸特征）
-    for _ in range(width * height // 500):
-        center_x = random.randint(0, width)
-        center_y = random.randint(0, height)
-        radius = random.randint(30, 100)
-        
-        for r in range(radius, 0, -5):
-            for angle in range(0, 360, 5):
-                rad = math.radians(angle)
-                x = int(center_x + r * math.cos(rad))
-                y = int(center_y + r * math.sin(rad))
-                
-                if 0 <= x < width and 0 <= y < height:
-                    # 云状渐变
-                    intensity = 1 - (r / radius)
-                    darken = int(15 * intensity * random.uniform(0.5, 1.0))
-                    
-                    r_current, g_current, b_current = texture.getpixel((x, y))
-                    new_color = (
-                        max(0, r_current - darken),
-                        max(0, g_current - darken),
-                        max(0, b_current - darken)
-                    )
-                    texture.putpixel((x, y), new_color)
-    
-    # 3. 添加宣纸特有的斑点（材料杂质）
-    for _ in range(width * height // 1000):
-        x = random.randint(0, width-1)
-        y = random.randint(0, height-1)
-        size = random.randint(2, 6)
-        
-        # 斑点颜色（类似树皮或草纤维）
-        spot_color = (
-            max(0, base_color[0] - random.randint(20, 40)),
-            max(0, base_color[1] - random.randint(15, 30)),
-            max(0, base_color[2] - random.randint(10, 25))
-        )
-        
-        for dx in range(-size, size+1):
-            for dy in range(-size, size+1):
-                if dx*dx + dy*dy <= size*size:  # 圆形斑点
-                    nx, ny = x + dx, y + dy
-                    if 0 <= nx < width and 0 <= ny < height:
-                        if random.random() < 0.8:
-                            texture.putpixel((nx, ny), spot_color)
-    
-    # 4. 宣纸的光泽效果（表面轻微反光）
-    highlight = Image.new('L', (width, height), 0)
-    for _ in range(width // 20):
-        x = random.randint(0, width)
-        y = random.randint(0, height)
-        radius = random.randint(50, 150)
-        
-        for r in range(radius, 0, -10):
-            brightness = int(255 * (1 - r/radius) * 0.3)  # 柔和的高光
-            for angle in range(0, 360, 10):
-                rad = math.radians(angle)
-                hx = int(x + r * math.cos(rad))
-                hy = int(y + r * math.sin(rad))
-                if 0 <= hx < width and 0 <= hy < height:
-                    current = highlight.getpixel((hx, hy))
-                    highlight.putpixel((hx, hy), max(current, brightness))
-    
-    highlight = highlight.filter(ImageFilter.GaussianBlur(15))
-    texture = Image.composite(texture, Image.new('RGB', (width, height), (255, 255, 255)), highlight)
-    
-    return texture
+def add_xuan_paper_texture_enhanced(width, height, tiled=False, seed=None,
+                                    cloud_scale=60, cloud_strength=1.0,
+                                    highlight_scale=100, highlight_strength=1.0):
+    """
+    增强的宣纸纹理（模仿真实的宣纸特性），由纸张规格引擎按 "xuan_enhanced" 规格生成
+    
+    tiled=True 时使用缓存的可平铺贴图拼接（贴图只生成一次），seed 决定纹理内容
+    （平铺模式下同时决定贴图和排布）
+    
+    Args:
+        cloud_scale: 云状纹理的斑块尺度（像素）
+        cloud_strength: 云状纹理强度（1.0 与原版逐环绘制的平均深浅一致）
+        highlight_scale: 光泽斑块尺度（像素）
+        highlight_strength: 光泽强度（1.0 与原版一致）
+    """
+    if tiled:
+        from .paper_texture_tiles import create_tiled_paper_texture
+        return create_tiled_paper_texture("xuan_enhanced", width, height, seed,
+                                          cloud_scale=cloud_scale, cloud_strength=cloud_strength,
+                                          highlight_scale=highlight_scale, highlight_strength=highlight_strength)
+    
+    # 云状纹理与光泽按参数覆盖规格：纤维的变暗量含云状纹理的平均变暗，
+    # 光泽遮罩的均值随高光数量（width // 20）与画布面积之比变化
+    cloud_darken = int(round(9 * cloud_strength))
+    highlight_mean = 11600.0 * (width // 20) / (width * height) * highlight_strength
+    return render_paper_texture(
+        width, height, "xuan_enhanced", seed,
+        mottling={"scale": cloud_scale, "strength": 9 * cloud_strength, "variation": 3 * cloud_strength},
+        fibers={"darken": (8 + cloud_darken, 15 + cloud_darken)},
+        shading={"scale": highlight_scale, "mean": highlight_mean, "std": 1.15 * math.sqrt(highlight_mean)}
+    )
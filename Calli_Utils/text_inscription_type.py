@@ -3,6 +3,27 @@ import random
 import math
 
 from Utils.date_format_tools import get_vertical_lunar_date
+from .ink_bleed_sprite_cache import draw_text_with_bleed
+
+
+def _draw_inscription_char(layer, draw, position, char, font, bleed_intensity=None):
+    """
+    在款识图层上绘制单个字
+
+    bleed_intensity 不为 None 时绘制为带墨迹渗透的字形精灵（相同字只计算一次渗透），
+    此时字形为不透明，由 _finish_inscription_layer 统一降低透明度
+    """
+    if bleed_intensity is None:
+        draw.text(position, char, fill=(60, 60, 60, 220), font=font)
+    else:
+        draw_text_with_bleed(layer, position, char, font, (60, 60, 60), bleed_intensity)
+
+
+def _finish_inscription_layer(image, layer, bleed_intensity=None):
+    """把款识图层合成到图像上（渗透精灵按款识的透明度 220 缩放 Alpha）"""
+    if bleed_intensity is not None:
+        layer.putalpha(layer.getchannel('A').point(lambda a: a * 220 // 255))
+    return Image.alpha_composite(image.convert('RGBA'), layer)
 
 def add_upper_inscription(image, recipient_name, honorific="先生", humble_word="雅正"):
     """为书法作品添加上款"""
@@ -27,8 +48,9 @@ def add_upper_inscription(image, recipient_name, honorific="先生", humble_word
     
     return result
 
-def add_vertical_upper_inscription(image, recipient_name, honorific="先生", humble_word="雅正", layout="traditional"):
-    """修正版竖排上款 - 支持不同布局"""
+def add_vertical_upper_inscription(image, recipient_name, honorific="先生", humble_word="雅正", layout="traditional",
+                                   bleed_intensity=None):
+    """修正版竖排上款 - 支持不同布局（bleed_intensity 不为 None 时每个字带墨迹渗透）"""
     upper_text = f"{recipient_name}{honorific}{humble_word}"
     
     print(f"🎁 添加竖排上款 ({layout}布局): {upper_text}")
@@ -59,10 +81,9 @@ def add_vertical_upper_inscription(image, recipient_name, honorific="先生", hu
     
     # 竖排绘制
     for i, char in enumerate(upper_text):
-        draw.text((upper_x, upper_y + i * 30), char, 
-                 fill=(60, 60, 60, 220), font=upper_font)
+        _draw_inscription_char(upper_layer, draw, (upper_x, upper_y + i * 30), char, upper_font, bleed_intensity)
     
-    result = Image.alpha_composite(image.convert('RGBA'), upper_layer)
+    result = _finish_inscription_layer(image, upper_layer, bleed_intensity)
     return result
 
 def add_special_upper_inscription(image, inscription_text, layout="traditional"):
@@ -176,9 +197,12 @@ def add_vertical_lower_inscription(image, author_name="某某", include_date=Tru
     return result
 
 def add_special_lower_inscription(image, author_name, purpose_text, 
-                                       include_date=True, layout="traditional", bottom_margin = 140):
+                                       include_date=True, layout="traditional", bottom_margin = 140,
+                                       bleed_intensity=None):
     """
     专门为您的需求定制的三列下款
+    
+    bleed_intensity 不为 None 时每个字带墨迹渗透（日期、作者等重复的字只计算一次渗透）
     """
     
     # 🎯 组织三列内容
@@ -244,10 +268,9 @@ def add_special_lower_inscription(image, author_name, purpose_text,
         for row_index, char in enumerate(column_text):
             char_y = current_y + row_index * 30
             print(f"   第{col_index}列, 第{row_index}行位置: x:{current_x} y: {char_y}")
-            draw.text((current_x, char_y), char, 
-                     fill=(60, 60, 60, 220), font=font)
+            _draw_inscription_char(inscription_layer, draw, (current_x, char_y), char, font, bleed_intensity)
     
-    result = Image.alpha_composite(image.convert('RGBA'), inscription_layer)
+    result = _finish_inscription_layer(image, inscription_layer, bleed_intensity)
     return result
 
 def shorten_purpose_text(purpose_text):
@@ -10,9 +10,10 @@ from Utils import get_vertical_lunar_date, get_precise_font_metrics
 from Utils import parse_position_shift, apply_position_shift
 from Calli_Utils import create_authentic_torn_paper
 from Calli_Utils import add_vertical_upper_inscription, add_vertical_lower_inscription, add_special_lower_inscription
-from Calli_Utils import add_ink_bleed_effect, add_ink_bleed_effect_enhanced, add_ink_bleed_effect_optimized
+from Calli_Utils import add_ink_bleed_effect, add_ink_bleed_effect_enhanced, ink_bleed_sweep
 from Calli_Utils import get_lishu_spacing
 from Calli_Utils import add_formal_seal, add_note_seal
+from Calli_Utils import draw_text_with_bleed
 
 # ==================== 基础工具函数 ====================
 
@@ -34,14 +35,24 @@ def create_test_image():
 
 # ==================== 横幅创建函数 ====================
 
-def create_traditional_banner(text_chars, paper_size=(1000, 300)):
+def draw_banner_char(paper, draw, position, char, font, fill=(30, 30, 30), bleed_intensity=None):
+    """
+    绘制横幅上的单个字
+    
+    bleed_intensity 不为 None 时绘制为带墨迹渗透的字形精灵（相同字只计算一次渗透）
+    """
+    if bleed_intensity is None:
+        draw.text(position, char, fill=fill, font=font)
+    else:
+        draw_text_with_bleed(paper, position, char, font, fill, bleed_intensity)
+
+def create_traditional_banner(text_chars, paper_size=(1000, 300), bleed_intensity=None):
     """创建传统从右到左的横幅"""
     if len(text_chars) != 4:
         raise ValueError("横幅应为四个汉字")
     
     # 创建宣纸背景
-    paper = create_authentic_torn_paper("handscroll", "xuan", 0.2)
-    paper = paper.resize(paper_size)
+    paper = create_authentic_torn_paper(paper_size, "xuan", 0.2)
     
     draw = ImageDraw.Draw(paper)
     
@@ -67,14 +78,13 @@ def create_traditional_banner(text_chars, paper_size=(1000, 300)):
         y_pos = height // 2 - 60
         
         print(f"  位置 {i+1}: '{char}' at ({x_pos}, {y_pos})")
-        draw.text((x_pos, y_pos), char, fill=(30, 30, 30), font=font)
+        draw_banner_char(paper, draw, (x_pos, y_pos), char, font, bleed_intensity=bleed_intensity)
     
     return paper
 
-def create_modern_banner(text_chars, paper_size=(1000, 300)):
+def create_modern_banner(text_chars, paper_size=(1000, 300), bleed_intensity=None):
     """创建现代从左到右的横幅"""
-    paper = create_authentic_torn_paper("handscroll", "xuan", 0.2)
-    paper = paper.resize(paper_size)
+    paper = create_authentic_torn_paper(paper_size, "xuan", 0.2)
     
     draw = ImageDraw.Draw(paper)
     
@@ -96,14 +106,14 @@ def create_modern_banner(text_chars, paper_size=(1000, 300)):
         y_pos = height // 2 - 60
         
         print(f"  位置 {i+1}: '{char}' at ({x_pos}, {y_pos})")
-        draw.text((x_pos, y_pos), char, fill=(30, 30, 30), font=font)
+        draw_banner_char(paper, draw, (x_pos, y_pos), char, font, bleed_intensity=bleed_intensity)
     
     return paper
 
 # ==================== 落款系统 ====================
 
 
-def add_banner_signature(banner, layout="traditional", author_name="某某"):
+def add_banner_signature(banner, layout="traditional", author_name="某某", bleed_intensity=None):
     """添加横幅下款"""
     width, height = banner.size
     draw = ImageDraw.Draw(banner)
@@ -123,8 +133,8 @@ def add_banner_signature(banner, layout="traditional", author_name="某某"):
         signature_y = height - 60
         signature_text = f"{author_name}书"
     
-    draw.text((signature_x, signature_y), signature_text, 
-              fill=(80, 80, 80), font=small_font)
+    draw_banner_char(banner, draw, (signature_x, signature_y), signature_text, small_font,
+                     fill=(80, 80, 80), bleed_intensity=bleed_intensity)
     
     print(f"  下款位置: ({signature_x}, {signature_y}) - '{signature_text}'")
     
@@ -175,15 +185,14 @@ def explain_lower_inscription_columns():
 
 
 
-def create_correct_traditional_banner(text_chars, paper_size=(1000, 300)):
+def create_correct_traditional_banner(text_chars, paper_size=(1000, 300), bleed_intensity=None):
     """正确的传统横幅 - 横排但从右到左"""
     
     if len(text_chars) != 4:
         raise ValueError("横幅应为四个汉字")
     
     # 创建宣纸背景
-    paper = create_authentic_torn_paper("handscroll", "xuan", 0.2)
-    paper = paper.resize(paper_size)
+    paper = create_authentic_torn_paper(paper_size, "xuan", 0.2)
     
     draw = ImageDraw.Draw(paper)
     
@@ -214,7 +223,7 @@ def create_correct_traditional_banner(text_chars, paper_size=(1000, 300)):
         y_pos = height // 2 - 60
         
         print(f"   第{i}字 '{char}': x={x_pos}")
-        draw.text((x_pos, y_pos), char, fill=(30, 30, 30), font=main_font)
+        draw_banner_char(paper, draw, (x_pos, y_pos), char, main_font, bleed_intensity=bleed_intensity)
     
     return paper
 
@@ -226,12 +235,11 @@ metrics = get_precise_font_metrics(main_font, "汉")
 char_width = metrics['full_width']
 char_height = metrics['actual_height']  # 使用实际高度，而不是包含边距的高度
 
-def create_perfectly_centered_banner(text_chars, paper_size=(1000, 300), position_shift=None):
+def create_perfectly_centered_banner(text_chars, paper_size=(1000, 300), position_shift=None, bleed_intensity=None):
     """修正垂直居中的横幅"""
     tear_intensity = 0.15       # 0.35, 0.40, 0.45
     
-    paper = create_authentic_torn_paper("tall-handscroll", "xuan", tear_intensity)
-    # paper = paper.resize(paper_size)
+    paper = create_authentic_torn_paper(paper_size, "xuan", tear_intensity)
     draw = ImageDraw.Draw(paper)
     
     width, height = paper_size
@@ -274,7 +282,7 @@ def create_perfectly_centered_banner(text_chars, paper_size=(1000, 300), positio
         traditional_index = total_chars - 1 - i
         x_pos = start_x + traditional_index * (char_width + spacing)
         
-        draw.text((x_pos, start_y), char, fill=(30, 30, 30), font=main_font)
+        draw_banner_char(paper, draw, (x_pos, start_y), char, main_font, bleed_intensity=bleed_intensity)
         print(f"   '{char}' 位置: ({x_pos:.1f}, {start_y:.1f})")
     
     return paper
@@ -286,7 +294,7 @@ def create_complete_banner(text, layout="traditional",
                           paper_size=(1500, 500),  # 🆕 纸张尺寸参数
                           add_upper=False, recipient_info=None,
                           add_ink_bleed=False, ink_intensity=0.3,
-                          author_name="某某", include_date=True):
+                          author_name="某某", include_date=True, add_seals=True):
     """
     完整书法横幅创建函数 - 支持自定义纸张尺寸
     
@@ -296,10 +304,11 @@ def create_complete_banner(text, layout="traditional",
         paper_size: (width, height) 元组，纸张尺寸 🆕
         add_upper: 是否添加上款
         recipient_info: 受赠人信息
-        add_ink_bleed: 是否添加墨迹渗透
+        add_ink_bleed: 是否添加墨迹渗透（每个字直接绘制为带渗透的字形精灵，相同字只计算一次）
         ink_intensity: 墨迹强度
         author_name: 作者姓名
         include_date: 是否包含日期
+        add_seals: 是否钤印（多强度扫描时先不钤印，渗透后再用 add_banner_seals 钤印）
     """
     
     if len(text) != 4:
@@ -311,13 +320,15 @@ def create_complete_banner(text, layout="traditional",
     print(f"=== 创建{layout}风格横幅: {text} ===")
     print(f"📐 纸张尺寸: {width} × {height} 像素 (比例: {width/height:.1f}:1)")
     
+    bleed_intensity = ink_intensity if add_ink_bleed else None
+    
     # 创建基础横幅
     if layout == "traditional":
         position_shift_str = "R20"
-        banner = create_perfectly_centered_banner(text_chars, paper_size, position_shift_str)
+        banner = create_perfectly_centered_banner(text_chars, paper_size, position_shift_str, bleed_intensity)
         print("🎋 传统布局: 横排主体 + 竖排落款")
     else:
-        banner = create_modern_banner(text_chars, paper_size)
+        banner = create_modern_banner(text_chars, paper_size, bleed_intensity)
         print("🏙️ 现代布局: 横排主体 + 竖排落款")
     
     # 添加竖排上款
@@ -327,7 +338,8 @@ def create_complete_banner(text, layout="traditional",
             recipient_info['name'],
             recipient_info.get('honorific', '先生'),
             recipient_info.get('humble_word', '雅正'),      # 这里雅正是缺省值
-            layout=layout
+            layout=layout,
+            bleed_intensity=bleed_intensity
         )
     
     # 添加竖排下款
@@ -337,17 +349,23 @@ def create_complete_banner(text, layout="traditional",
         "颂舞者健美肱肌",
         include_date,
         layout=layout,
-        
+        bleed_intensity=bleed_intensity
     )
     
-    # 添加墨迹渗透效果
     if add_ink_bleed:
-        # 添加墨迹渗透效果
-        bleeding_intensity = 0.45
-        banner = add_ink_bleed_effect_optimized(banner, bleeding_intensity) 
         print(f"🎨 添加墨迹渗透效果，强度: {ink_intensity}")
 
 
+    if add_seals:
+        banner = add_banner_seals(banner, author_name)
+    
+    return banner
+
+
+def add_banner_seals(banner, author_name):
+    """钤盖落款印和闲章"""
+    width, height = banner.size
+
     banner = add_formal_seal(banner, author_name, (60, 60))   
 
 
@@ -511,16 +529,18 @@ def demo_ink_bleed_effects():
     
     intensities = [0.1, 0.3, 0.6, 0.9]
     
-    for intensity in intensities:
+    # 横幅只创建一次，各强度共用文字掩码和随机数，逐个生成、保存
+    banner = create_complete_banner(
+        text=test_text,
+        layout="traditional",
+        author_name="墨客",
+        add_seals=False
+    )
+    
+    for intensity, result in ink_bleed_sweep(banner, intensities):
         print(f"🎨 墨迹强度: {intensity}")
-        banner = create_complete_banner(
-            text=test_text,
-            layout="traditional",
-            add_ink_bleed=True,
-            ink_intensity=intensity,
-            author_name="墨客"
-        )
-        banner.save(f"ink_bleed_{intensity}.png")
+        result = add_banner_seals(result, "墨客")
+        result.save(f"ink_bleed_{intensity}.png")
         print(f"   ✅ 保存: ink_bleed_{intensity}.png")
     
     print()
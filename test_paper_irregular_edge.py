@@ -2,6 +2,7 @@ import numpy as np
 from PIL import Image, ImageDraw, ImageFilter, ImageChops
 import random
 import math
+from Calli_Utils.paper_aging import new_fade_map, add_water_stains, add_color_spots, apply_fade_map
 
 def create_paper_texture(width, height, paper_type="xuan"):
     """创建基础纸张纹理"""
@@ -113,50 +114,19 @@ def add_fiber_edges(mask, fiber_density=0.3):
     
     return Image.fromarray(mask_array)
 
-def add_aging_effects(paper_img, intensity=0.3):
-    """添加老化效果：水渍、色斑等"""
+def add_aging_effects(paper_img, intensity=0.3, seed=None):
+    """添加老化效果：水渍、色斑等（一次性盖章，整体只处理一遍像素）"""
     width, height = paper_img.size
-    aged_img = paper_img.copy()
-    pixels = aged_img.load()
-    
-    # 添加随机水渍
-    for _ in range(int(50 * intensity)):
-        # 随机水渍位置和大小
-        center_x = random.randint(0, width)
-        center_y = random.randint(0, height)
-        radius = random.randint(10, 50)
-        
-        for i in range(max(0, center_x - radius), min(width, center_x + radius)):
-            for j in range(max(0, center_y - radius), min(height, center_y + radius)):
-                dist = math.sqrt((i - center_x)**2 + (j - center_y)**2)
-                if dist < radius:
-                    # 水渍效果：颜色变深
-                    r, g, b = pixels[i, j]
-                    fade = 1 - (dist / radius) * 0.3  # 中心更明显
-                    pixels[i, j] = (
-                        int(r * fade),
-                        int(g * fade),
-                        int(b * fade)
-                    )
-    
-    # 添加随机色斑
-    for _ in range(int(20 * intensity)):
-        x = random.randint(0, width-1)
-        y = random.randint(0, height-1)
-        spot_size = random.randint(2, 8)
-        
-        for i in range(max(0, x-spot_size), min(width, x+spot_size)):
-            for j in range(max(0, y-spot_size), min(height, y+spot_size)):
-                if random.random() < 0.7:
-                    r, g, b = pixels[i, j]
-                    # 黄色或棕色斑点
-                    pixels[i, j] = (
-                        min(255, int(r * 1.1)),
-                        min(255, int(g * 0.9)),
-                        min(255, int(b * 0.8))
-                    )
-    
-    return aged_img
+    rng = np.random.default_rng(seed)
+    fade_map = new_fade_map((height, width))
+    
+    # 随机水渍：中心颜色变深
+    add_water_stains(fade_map, int(50 * intensity), (10, 50), 0.3, rng)
+    
+    # 随机色斑：黄色或棕色斑点
+    add_color_spots(fade_map, int(20 * intensity), (2, 8), 0.7, (1.1, 0.9, 0.8), rng)
+    
+    return apply_fade_map(paper_img, fade_map)
 
 def create_realistic_paper(width, height, paper_type="xuan", roughness=0.5):
     """创建逼真的纸张效果"""
@@ -7,7 +7,8 @@ from Calli_Utils import add_organic_torn_mask, safe_apply_mask
 from Calli_Utils import create_authentic_paper_texture, add_realistic_aging
 from Calli_Utils import apply_seal_safely, create_realistic_seal, add_texture_and_aging
 from Calli_Utils import add_circular_seal_with_rotation
-from Calli_Utils import add_ink_bleed_effect, add_ink_bleed_effect_optimized
+from Calli_Utils import add_ink_bleed_effect_optimized
+from Calli_Utils import draw_text_with_bleed
 import os
 import numpy as np
 import random
@@ -256,11 +257,20 @@ def quick_fix_test():
     else:
         print("✗ 撕边效果有变化")
 
-def create_real_vertical_poem(image, poem_title, poem_text, poem_author, poem_note, seal_official_text, seal_recreative_text):
-    """生成真正的竖排《彩书怨》"""
+def create_real_vertical_poem(image, poem_title, poem_text, poem_author, poem_note, seal_official_text, seal_recreative_text, bleed_intensity=None):
+    """生成真正的竖排《彩书怨》
+    
+    bleed_intensity 不为 None 时，每个字直接绘制为带墨迹渗透的字形精灵（相同字只计算一次渗透）
+    """
     
     draw = ImageDraw.Draw(image)
     
+    def draw_char(position, char, font, fill):
+        if bleed_intensity is None:
+            draw.text(position, char, font=font, fill=fill)
+        else:
+            draw_text_with_bleed(image, position, char, font, fill, bleed_intensity)
+    
     # 加载字体
     try:
         large_font = safe_get_font("方正行楷_GBK.ttf", 60)        #五言75点；七言55点
@@ -294,27 +304,27 @@ def create_real_vertical_poem(image, poem_title, poem_text, poem_author, poem_no
                 char = poem_chars[char_index]
                 char_x = start_x - col * line_spacing
                 char_y = start_y + row * char_spacing
-                draw.text((char_x, char_y), char, font=large_font, fill=(0, 0, 0))
+                draw_char((char_x, char_y), char, large_font, (0, 0, 0))
     
     # 添加标题"彩书怨"（竖排在右侧）
     title_chars = list(poem_title)
     title_x = start_x + 120  # 诗句右侧
     for i, char in enumerate(title_chars):
-        draw.text((title_x, start_y + i * 60), char, font=medium_font, fill=(0, 0, 0))   
+        draw_char((title_x, start_y + i * 60), char, medium_font, (0, 0, 0))   
     
     # 添加作者"上官婉儿"（竖排在标题右侧）
     author_chars = list(poem_author)
     author_x = char_x - 200
     author_y = start_y + 55
     for i, char in enumerate(author_chars):
-        draw.text((author_x, author_y + i * char_spacing), char, font=small_font, fill=(0, 0, 0))
+        draw_char((author_x, author_y + i * char_spacing), char, small_font, (0, 0, 0))
 
     # 添加说明文字
     author_note_chars = list(poem_note)   
     note_start_x = author_x - 35
     note_start_y = author_y
     for i, char in enumerate(author_note_chars):
-        draw.text((note_start_x, note_start_y + i * 35), char, font=small_font, fill=(80, 80, 80))
+        draw_char((note_start_x, note_start_y + i * 35), char, small_font, (80, 80, 80))
 
     # 添加日期
     # 日期（右列，与作者名纵向对齐）
@@ -329,8 +339,8 @@ def create_real_vertical_poem(image, poem_title, poem_text, poem_author, poem_no
     for row_index, column_chars in enumerate(lunar_date_chars):
         for col_index, char in enumerate(column_chars):
             if char:
-                draw.text((date_start_x + col_index * 35, date_start_y + row_index * 35), 
-                         char, font=small_font, fill=(80, 80, 80))
+                draw_char((date_start_x + col_index * 35, date_start_y + row_index * 35), 
+                          char, small_font, (80, 80, 80))
 
     date_end_y = date_start_y + (row_index + 1) * 35    # 计算日期底部变量以使闲章与它对其           
 
@@ -404,10 +414,9 @@ if __name__ == "__main__":
     poem_note = "贺冠绝国潮风华舞赛魁"
     seal_official_text = "玻璃耗子"
     seal_recreative_text = "耗气长存"
-    paper = create_real_vertical_poem(paper, poem_title, poem_text, poem_author, poem_note, seal_official_text, seal_recreative_text)
-    
-    # 添加墨迹渗透效果
-    paper = add_ink_bleed_effect(paper, bleeding_intensity) 
+    # 逐字绘制带墨迹渗透的字形（重复的字复用缓存的渗透精灵）
+    paper = create_real_vertical_poem(paper, poem_title, poem_text, poem_author, poem_note, seal_official_text, seal_recreative_text,
+                                      bleed_intensity=bleeding_intensity)
     if paper:
         paper.save(f"torn_paper_{intensity}.png")
         print(f"撕边强度 {intensity} 创建成功")
@@ -6,9 +6,18 @@ import numpy as np
 
 from Calli_Utils import add_ink_bleed_effect_enhanced, add_subtle_ink_effect, add_ink_bleed_effect_parchment
 from Calli_Utils import add_xuan_paper_texture_enhanced, add_rice_paper_texture_enhanced, add_parchment_texture_enhanced
+from Calli_Utils import add_ink_diffusion_effect
 
-def add_material_specific_ink_effect(image, paper_type):
-    """根据纸张类型添加特定的墨迹效果"""
+def add_material_specific_ink_effect(image, paper_type, engine="classic", paper_texture=None):
+    """
+    根据纸张类型添加特定的墨迹效果
+
+    engine: "classic" 随机散点渗透；"diffusion" 沿纸张纤维场迭代扩散求解
+    paper_texture: 写字前的纸张纹理，diffusion 引擎从中估计纤维场（不传则从带字图像估计）
+    """
+    
+    if engine == "diffusion" and paper_type in ("xuan", "rice", "parchment"):
+        return add_ink_diffusion_effect(image, paper_type, paper_texture=paper_texture, image_mode=image.mode)
     
     if paper_type == "xuan":
         # 宣纸：明显的渗透和扩散
@@ -25,8 +34,8 @@ def add_material_specific_ink_effect(image, paper_type):
     else:
         return image
 
-def create_material_comparison():
-    """创建三种纸张材质的对比图"""
+def create_material_comparison(engine="classic"):
+    """创建三种纸张材质的对比图（engine 见 add_material_specific_ink_effect）"""
     
     width, height = 400, 300
     comparison = Image.new('RGB', (1200, 900), (255, 255, 255))
@@ -63,7 +72,7 @@ def create_material_comparison():
         test_draw.text((50, 120), "材质测试", font=font, fill=(0, 0, 0))
         
         # 应用材质特定的墨迹效果
-        test_image = add_material_specific_ink_effect(test_image, paper_type)
+        test_image = add_material_specific_ink_effect(test_image, paper_type, engine, paper_texture=texture)
         
         # 粘贴到对比图
         x = 50 + i * 400